@@ -1,13 +1,15 @@
 # Main entry point for running the box placement model test
 
 from tests.test_A_box_placement_model import run_box_placement_test, print_model_solution
-from utils.pipeline import  run_box_placement, run_reccomend_fill, run_full_pipeline
-from utils.visualize_boxes import plot_boxes_3d, plot_modelA, plot_modelA_with_extras
+from utils.pipeline import  run_full_pipeline, run_pipeline_with_deadline
+from utils.visualize_boxes import plot_layout, plot_layout_with_extras
 from models.A_box_placement_model import BoxPlacementModel
+from utils.validate_layout import validate_layout, print_violations
 import time
 
 W, L, H = 235, 1203, 270
 BUF = 5
+DEADLINE = 90  # seconds for the whole pipeline (A + B)
 
 """
 This version of the code implements a two-stage pipeline: 
@@ -29,33 +31,29 @@ until the second model is extended into actual 3D placement logic.
 def main():
     excel_path = "sample_instances/input_template.xlsx"
 
-    # A: placement
-    # Runs Model A 
-    # Returns the modelA instance, the leftover empty lenght in container, the pallet coordinate data
-    modelA, free_len, pallets_data = run_box_placement(
+    # A + B within one overall deadline (seconds).
+    # Model A stops early when it reaches its bound or stagnates,
+    # the remaining time goes to Model B.
+    result = run_pipeline_with_deadline(
         excel_path, W, L, H, BUF,
-        solver="ortools",
-        time_limit=60
+        deadline=DEADLINE,
+        solver="ortools"
     )
-    if modelA is None:
+    if result is None:
         return
 
-    plot_modelA(modelA, W, L, H)
+    layout = result["layout"]
+    pallets_data = result["pallets_data"]
+    plot_layout(layout)
 
-    # B: recommend fill (uses pallets_data + free_len)
-    rec = run_reccomend_fill(
-        pallets_data,
-        BUF,
-        free_len,
-        solver="ortools",
-        time_limit=30
-    )
+    rec = result["rec"]
     if rec is None:
         print("No extra pallets recommended.")
         return
 
     add_list = rec["add"]
-    plot_modelA_with_extras(modelA, add_list, pallets_data, BUF, W, L, H)
+    layout_all = plot_layout_with_extras(layout, add_list, pallets_data)
+    print_violations(validate_layout(layout_all))
 
 
 
@@ -0,0 +1,343 @@
+# Same Model A as BoxPlacementModel, but written straight into an OR-Tools
+# CP-SAT model. Constraints are emitted pair by pair while looping, so no
+# CPMpy expression trees are built, flattened or transformed. The public
+# attributes (x, y, z, rot, eff_len, eff_wid, extents, num_boxes, ...) and
+# solve() / hint_from_boxes() behave like the CPMpy version, so Layout,
+# the pipeline, LNS and the visualizer work with either backend.
+
+import numpy as np
+from ortools.sat.python import cp_model as ort
+
+
+class CpSatVar:
+    """CP-SAT variable with the CPMpy-style value() accessor."""
+
+    def __init__(self, owner, var):
+        self._owner = owner
+        self.var = var
+
+    def value(self):
+        return self._owner._value(self.var)
+
+
+class CpSatVarArray(list):
+    """
+    List of CpSatVar (and presolve constants); value() returns all
+    values at once, like NDVarArray.
+    """
+
+    def value(self):
+        return np.array([v.value() if isinstance(v, CpSatVar) else v for v in self])
+
+
+class CpSatBoxPlacementModel:
+
+    def __init__(self, lengths, widths, heights, W, L, H, BUF, presolved=None, fixed_boxes=None):
+        # Input data
+        self.lengths = list(lengths)
+        self.widths  = list(widths)
+        self.heights = list(heights)
+        self.W = int(W)
+        self.L = int(L)
+        self.H = int(H)
+        self.BUF = int(BUF)
+
+        self.num_boxes = len(self.lengths)
+        assert self.num_boxes == len(self.widths) == len(self.heights)
+
+        # Same meaning as in BoxPlacementModel
+        self.presolved = presolved
+        if presolved is not None:
+            assert presolved.num_boxes == self.num_boxes
+        self.fixed = [
+            tuple(int(b[k]) for k in ("x", "y", "z", "w", "l", "h"))
+            for b in (fixed_boxes if fixed_boxes is not None else [])
+        ]
+
+        self.model = ort.CpModel()
+        self.ort_solver = None
+        self._solved = False
+
+        self._create_variables()
+        self._create_constraints()
+        self._create_objective()
+
+    # ------------------------------------------------------------------
+    # Variables
+    # ------------------------------------------------------------------
+    def _wrap(self, var):
+        return CpSatVar(self, var)
+
+    def _value(self, var):
+        if not self._solved:
+            return None
+        return self.ort_solver.value(var)
+
+    def _create_variables(self):
+        n = self.num_boxes
+        m = self.model
+        pre = self.presolved
+
+        # Decision Variables: positions (floor-only pallets get z fixed to 0)
+        self._x = [m.new_int_var(0, self.W, f"x[{p}]") for p in range(n)]
+        self._y = [m.new_int_var(0, self.L, f"y[{p}]") for p in range(n)]
+        self._z = [
+            m.new_int_var(0, 0 if pre is not None and pre.must_floor[p] else self.H, f"z[{p}]")
+            for p in range(n)
+        ]
+        self.x = CpSatVarArray(self._wrap(v) for v in self._x)
+        self.y = CpSatVarArray(self._wrap(v) for v in self._y)
+        self.z = CpSatVarArray(self._wrap(v) for v in self._z)
+
+        # Rotation: 0 = normal, 1 = swapped
+        # Effective dimensions after rotation: plain ints when fixed by presolve
+        max_len_or_wid = max(max(self.lengths), max(self.widths))
+        self._rot, self._eff_len, self._eff_wid = [], [], []
+        self.rot, self.eff_len, self.eff_wid = (CpSatVarArray() for _ in range(3))
+        for p in range(n):
+            fixed = None if pre is None else pre.fixed_rot[p]
+            if fixed is None:
+                rot = m.new_bool_var(f"rot[{p}]")
+                eff_len = m.new_int_var(0, max_len_or_wid, f"eff_len[{p}]")
+                eff_wid = m.new_int_var(0, max_len_or_wid, f"eff_wid[{p}]")
+                self._rot.append(rot)
+                self._eff_len.append(eff_len)
+                self._eff_wid.append(eff_wid)
+                self.rot.append(self._wrap(rot))
+                self.eff_len.append(self._wrap(eff_len))
+                self.eff_wid.append(self._wrap(eff_wid))
+            else:
+                eff_len = self.lengths[p] if fixed == 0 else self.widths[p]
+                eff_wid = self.widths[p] if fixed == 0 else self.lengths[p]
+                self._rot.append(None)
+                self._eff_len.append(eff_len)
+                self._eff_wid.append(eff_wid)
+                self.rot.append(fixed)
+                self.eff_len.append(eff_len)
+                self.eff_wid.append(eff_wid)
+
+        # Extents / bounding box over all boxes
+        self._max_used_height = m.new_int_var(0, self.H, "max_used_height")
+        self._max_x_extent    = m.new_int_var(0, self.W, "max_x_extent")
+        self._max_y_extent    = m.new_int_var(0, self.L, "max_y_extent")
+        self.max_used_height = self._wrap(self._max_used_height)
+        self.max_x_extent    = self._wrap(self._max_x_extent)
+        self.max_y_extent    = self._wrap(self._max_y_extent)
+
+    # ------------------------------------------------------------------
+    # Constraints
+    # ------------------------------------------------------------------
+    def _create_constraints(self):
+        self._add_rotation_constraints()
+        self._add_inside_container_constraints()
+        self._add_no_overlap_constraints()
+        self._add_no_levitation_constraints()
+        self._add_bounding_box_constraints()
+        self._add_symmetry_breaking_constraints()
+
+    def _add_rotation_constraints(self):
+        """eff_len = len + (wid - len) * rot, eff_wid = wid + (len - wid) * rot"""
+        m = self.model
+        for p in range(self.num_boxes):
+            rot = self._rot[p]
+            if rot is None:
+                continue
+            Lp, Wp = self.lengths[p], self.widths[p]
+            m.add(self._eff_len[p] == Lp + (Wp - Lp) * rot)
+            m.add(self._eff_wid[p] == Wp + (Lp - Wp) * rot)
+
+    def _add_inside_container_constraints(self):
+        """Each box must lie fully inside the container."""
+        m = self.model
+        for p in range(self.num_boxes):
+            m.add(self._x[p] + self._eff_wid[p] <= self.W)
+            m.add(self._y[p] + self._eff_len[p] <= self.L)
+            m.add(self._z[p] + self.heights[p] <= self.H)
+
+    def _add_disjunction(self, conditions):
+        """At least one of the linear conditions holds (one literal each)."""
+        m = self.model
+        literals = []
+        for cond in conditions:
+            lit = m.new_bool_var("")
+            m.add(cond).only_enforce_if(lit)
+            literals.append(lit)
+        m.add_bool_or(literals)
+        return literals
+
+    def _add_no_overlap_constraints(self):
+        """
+        Apart in x OR apart in y (with buffer) OR stacked in z, for every pair,
+        and for every free / fixed pair. Emitted pair by pair.
+        """
+        n = self.num_boxes
+        B = self.BUF
+        pre = self.presolved
+        x, y, z = self._x, self._y, self._z
+        ew, el = self._eff_wid, self._eff_len
+
+        for p in range(n):
+            Hp = self.heights[p]
+            for q in range(p + 1, n):
+                Hq = self.heights[q]
+                conds = [
+                    x[p] + ew[p] + B <= x[q],
+                    x[q] + ew[q] + B <= x[p],
+                    y[p] + el[p] + B <= y[q],
+                    y[q] + el[q] + B <= y[p],
+                ]
+                if pre is None or pre.can_be_below(p, q):
+                    conds.append(z[p] + Hp <= z[q])
+                if pre is None or pre.can_be_below(q, p):
+                    conds.append(z[q] + Hq <= z[p])
+                self._add_disjunction(conds)
+
+            floor_only = pre is not None and pre.must_floor[p]
+            for (fx, fy, fz, fw, fl, fh) in self.fixed:
+                conds = [
+                    x[p] + ew[p] + B <= fx,
+                    x[p] >= fx + fw + B,
+                    y[p] + el[p] + B <= fy,
+                    y[p] >= fy + fl + B,
+                ]
+                if Hp <= fz:
+                    conds.append(z[p] + Hp <= fz)
+                if fz + fh + Hp <= self.H and not floor_only:
+                    conds.append(z[p] >= fz + fh)
+                self._add_disjunction(conds)
+
+    def _add_no_levitation_constraints(self):
+        """On the floor, OR fully supported by one (free or fixed) pallet directly below."""
+        n = self.num_boxes
+        m = self.model
+        pre = self.presolved
+        x, y, z = self._x, self._y, self._z
+        ew, el = self._eff_wid, self._eff_len
+
+        for p in range(n):
+            if pre is not None and pre.must_floor[p]:
+                continue  # z[p] already fixed to 0
+
+            on_floor = m.new_bool_var("")
+            m.add(z[p] == 0).only_enforce_if(on_floor)
+            literals = [on_floor]
+
+            for q in range(n):
+                if q == p or (pre is not None and not pre.can_support(q, p)):
+                    continue
+                lit = m.new_bool_var("")
+                m.add(z[p] == z[q] + self.heights[q]).only_enforce_if(lit)
+                m.add(x[p] >= x[q]).only_enforce_if(lit)
+                m.add(x[p] + ew[p] <= x[q] + ew[q]).only_enforce_if(lit)
+                m.add(y[p] >= y[q]).only_enforce_if(lit)
+                m.add(y[p] + el[p] <= y[q] + el[q]).only_enforce_if(lit)
+                literals.append(lit)
+
+            for k, (fx, fy, fz, fw, fl, fh) in enumerate(self.fixed):
+                if pre is not None and k not in pre.fixed_supporters[p]:
+                    continue
+                lit = m.new_bool_var("")
+                m.add(z[p] == fz + fh).only_enforce_if(lit)
+                m.add(x[p] >= fx).only_enforce_if(lit)
+                m.add(x[p] + ew[p] <= fx + fw).only_enforce_if(lit)
+                m.add(y[p] >= fy).only_enforce_if(lit)
+                m.add(y[p] + el[p] <= fy + fl).only_enforce_if(lit)
+                literals.append(lit)
+
+            m.add_bool_or(literals)
+
+    def _add_bounding_box_constraints(self):
+        """Extents over all boxes, fixed pallets included."""
+        n = self.num_boxes
+        m = self.model
+        m.add_max_equality(
+            self._max_x_extent,
+            [self._x[p] + self._eff_wid[p] for p in range(n)] +
+            [fx + fw for (fx, fy, fz, fw, fl, fh) in self.fixed]
+        )
+        m.add_max_equality(
+            self._max_y_extent,
+            [self._y[p] + self._eff_len[p] for p in range(n)] +
+            [fy + fl for (fx, fy, fz, fw, fl, fh) in self.fixed]
+        )
+        m.add_max_equality(
+            self._max_used_height,
+            [self._z[p] + self.heights[p] for p in range(n)] +
+            [fz + fh for (fx, fy, fz, fw, fl, fh) in self.fixed]
+        )
+
+    def _add_symmetry_breaking_constraints(self):
+        """Identical pallets: x[p] < x[q] OR (x[p] == x[q] AND y[p] <= y[q])."""
+        n = self.num_boxes
+        m = self.model
+        x, y = self._x, self._y
+
+        # Group identical pallets instead of comparing every pair
+        groups = {}
+        for p in range(n):
+            groups.setdefault((self.lengths[p], self.widths[p], self.heights[p]), []).append(p)
+
+        for members in groups.values():
+            for i, p in enumerate(members):
+                for q in members[i + 1:]:
+                    before = m.new_bool_var("")
+                    same_x = m.new_bool_var("")
+                    m.add(x[p] + 1 <= x[q]).only_enforce_if(before)
+                    m.add(x[p] == x[q]).only_enforce_if(same_x)
+                    m.add(y[p] <= y[q]).only_enforce_if(same_x)
+                    m.add_bool_or([before, same_x])
+
+    # ------------------------------------------------------------------
+    # Objective
+    # ------------------------------------------------------------------
+    def _create_objective(self):
+        """minimize 1000 * max_used_height + max_y_extent + max_x_extent"""
+        self.model.minimize(
+            1000 * self._max_used_height + self._max_y_extent + self._max_x_extent
+        )
+
+    # ------------------------------------------------------------------
+    # Solve
+    # ------------------------------------------------------------------
+    def solve(self, hint=None, monitor=None, solver="ortools", time_limit=None, **params):
+        """
+        Solve with CP-SAT. Same arguments as BoxPlacementModel.solve;
+        any other keyword is set on the CP-SAT parameters
+        (e.g. num_search_workers=8).
+        Returns True if a solution is found, False otherwise.
+        """
+        assert solver in (None, "ortools"), "The CP-SAT backend only runs on ortools"
+
+        self.model.clear_hints()
+        if hint is not None:
+            for var, val in zip(*hint):
+                self.model.add_hint(var.var, int(val))
+
+        self.ort_solver = ort.CpSolver()
+        if time_limit is not None:
+            self.ort_solver.parameters.max_time_in_seconds = float(time_limit)
+        for key, val in params.items():
+            setattr(self.ort_solver.parameters, key, val)
+
+        if monitor is None:
+            status = self.ort_solver.solve(self.model)
+        else:
+            monitor.attach(self)
+            try:
+                status = self.ort_solver.solve(self.model, solution_callback=monitor)
+            finally:
+                monitor.detach()
+
+        self._solved = status in (ort.OPTIMAL, ort.FEASIBLE)
+        return self._solved
+
+    def hint_from_boxes(self, boxes):
+        """Solution hint from a previous placement (see BoxPlacementModel)."""
+        variables, values = [], []
+        for p, b in enumerate(boxes):
+            variables += [self.x[p], self.y[p], self.z[p]]
+            values    += [int(b["x"]), int(b["y"]), int(b["z"])]
+            if self._rot[p] is not None:
+                variables.append(self.rot[p])
+                values.append(int(b["rot"]))
+        return variables, values
@@ -2,9 +2,19 @@ from cpmpy import *
 from cpmpy import any as cpm_any
 
 
+def solution_value(expr):
+    """
+    Value of a model entry in the current solution.
+    Entries fixed by presolve are plain ints and are returned as-is.
+    """
+    if hasattr(expr, "value"):
+        return expr.value()
+    return int(expr)
+
+
 class BoxPlacementModel:
 
-    def __init__(self, lengths, widths, heights, W, L, H, BUF):
+    def __init__(self, lengths, widths, heights, W, L, H, BUF, presolved=None, fixed_boxes=None):
         # Input data
         self.lengths = list(lengths)
         self.widths  = list(widths)
@@ -17,6 +27,22 @@ class BoxPlacementModel:
         self.num_boxes = len(self.lengths)
         assert self.num_boxes == len(self.widths) == len(self.heights)
 
+        # Optional PresolvedInstance (utils/presolve.py) for the same pallets.
+        # When given, fixed orientations become constants and impossible
+        # stacking / support disjuncts are left out of the model.
+        self.presolved = presolved
+        if presolved is not None:
+            assert presolved.num_boxes == self.num_boxes
+
+        # Optional immovable pallets (Layout rows or box dicts with
+        # x, y, z, w, l, h), e.g. the part of a layout kept fixed by LNS.
+        # The free pallets must keep clear of them and may stand on them.
+        # A presolved instance must have been built with the same fixed_boxes.
+        self.fixed = [
+            tuple(int(b[k]) for k in ("x", "y", "z", "w", "l", "h"))
+            for b in (fixed_boxes if fixed_boxes is not None else [])
+        ]
+
         # Create model, vars, constraints, objective
         self._create_variables()
         self._create_constraints()
@@ -29,17 +55,35 @@ class BoxPlacementModel:
         n = self.num_boxes
 
         # Decision Variables: positions
-        self.x = intvar(0, self.W, shape=n, name="x")  # x-position
-        self.y = intvar(0, self.L, shape=n, name="y")  # y-position
-        self.z = intvar(0, self.H, shape=n, name="z")  # z-position
+        # (shape=(n,) keeps 1-D arrays for a single pallet; shape=1 gives a scalar)
+        self.x = intvar(0, self.W, shape=(n,), name="x")  # x-position
+        self.y = intvar(0, self.L, shape=(n,), name="y")  # y-position
+        self.z = intvar(0, self.H, shape=(n,), name="z")  # z-position
 
         # Rotation: 0 = normal, 1 = swapped
-        self.rot = boolvar(shape=n, name="rot")
-
         # Effective dimensions after rotation
         max_len_or_wid = max(max(self.lengths), max(self.widths))
-        self.eff_len = intvar(0, max_len_or_wid, shape=n, name="eff_len")
-        self.eff_wid = intvar(0, max_len_or_wid, shape=n, name="eff_wid")
+        if self.presolved is None:
+            self.rot = boolvar(shape=(n,), name="rot")
+            self.eff_len = intvar(0, max_len_or_wid, shape=(n,), name="eff_len")
+            self.eff_wid = intvar(0, max_len_or_wid, shape=(n,), name="eff_wid")
+        else:
+            # Pallets with a fixed orientation get constants instead of vars
+            self.rot, self.eff_len, self.eff_wid = [], [], []
+            for p in range(n):
+                fixed = self.presolved.fixed_rot[p]
+                if fixed is None:
+                    self.rot.append(boolvar(name=f"rot[{p}]"))
+                    self.eff_len.append(intvar(0, max_len_or_wid, name=f"eff_len[{p}]"))
+                    self.eff_wid.append(intvar(0, max_len_or_wid, name=f"eff_wid[{p}]"))
+                elif fixed == 0:
+                    self.rot.append(0)
+                    self.eff_len.append(self.lengths[p])
+                    self.eff_wid.append(self.widths[p])
+                else:
+                    self.rot.append(1)
+                    self.eff_len.append(self.widths[p])
+                    self.eff_wid.append(self.lengths[p])
 
         # Extents / bounding box over all boxes
         self.max_used_height = intvar(0, self.H, name="max_used_height")
@@ -68,6 +112,9 @@ class BoxPlacementModel:
         """Rotation: if rot[p]=0 -> (eff_len=len, eff_wid=wid),
                      if rot[p]=1 -> (eff_len=wid, eff_wid=len)"""
         for p in range(self.num_boxes):
+            if self.presolved is not None and self.presolved.fixed_rot[p] is not None:
+                continue  # orientation fixed by presolve, eff_len/eff_wid are constants
+
             Lp = self.lengths[p]
             Wp = self.widths[p]
 
@@ -94,9 +141,11 @@ class BoxPlacementModel:
           - strictly apart in x OR
           - strictly apart in y OR
           - non-overlapping in z (stacked).
+        With presolve, z-disjuncts for pairs that can never be stacked are dropped.
         """
         n = self.num_boxes
         B = self.BUF
+        pre = self.presolved
 
         for p in range(n):
             for q in range(p + 1, n):
@@ -110,17 +159,31 @@ class BoxPlacementModel:
                 sep_y = self.y[p] + self.eff_len[p] + B <= self.y[q]
                 sep_y_rev = self.y[q] + self.eff_len[q] + B <= self.y[p]
 
-                sep_z = self.z[p] + Hp <= self.z[q]
-                sep_z_rev = self.z[q] + Hq <= self.z[p]
+                disjuncts = [sep_x, sep_x_rev, sep_y, sep_y_rev]
 
-                self.model += (
-                    sep_x |
-                    sep_x_rev |
-                    sep_y |
-                    sep_y_rev |
-                    sep_z |
-                    sep_z_rev
-                )
+                if pre is None or pre.can_be_below(p, q):
+                    disjuncts.append(self.z[p] + Hp <= self.z[q])      # sep_z
+                if pre is None or pre.can_be_below(q, p):
+                    disjuncts.append(self.z[q] + Hq <= self.z[p])      # sep_z_rev
+
+                self.model += cpm_any(disjuncts)
+
+        # Free pallets vs fixed pallets: same disjunction with constants
+        for p in range(n):
+            Hp = self.heights[p]
+            floor_only = pre is not None and pre.must_floor[p]
+            for (fx, fy, fz, fw, fl, fh) in self.fixed:
+                disjuncts = [
+                    self.x[p] + self.eff_wid[p] + B <= fx,
+                    fx + fw + B <= self.x[p],
+                    self.y[p] + self.eff_len[p] + B <= fy,
+                    fy + fl + B <= self.y[p],
+                ]
+                if Hp <= fz:
+                    disjuncts.append(self.z[p] + Hp <= fz)             # below fixed
+                if fz + fh + Hp <= self.H and not floor_only:
+                    disjuncts.append(fz + fh <= self.z[p])             # on top of fixed
+                self.model += cpm_any(disjuncts)
 
     def _add_no_levitation_constraints(self):
         """
@@ -130,18 +193,27 @@ class BoxPlacementModel:
             - it is supported by some other box q (q != p) such that
                 z[p] = z[q] + h[q]
                 and the footprint of p is within footprint of q.
+        With presolve, only pallets q that can ever carry p are considered,
+        and pallets that nothing can carry are pinned to the floor.
         """
         n = self.num_boxes
+        pre = self.presolved
 
         for p in range(n):
             # p sits on the floor:
             on_floor = (self.z[p] == 0)
 
+            if pre is not None and pre.must_floor[p]:
+                self.model += on_floor
+                continue
+
             # OR p is supported by some q != p
             support_exprs = []
             for q in range(n):
                 if q == p:
                     continue
+                if pre is not None and not pre.can_support(q, p):
+                    continue
 
                 Hq = self.heights[q]
 
@@ -155,6 +227,18 @@ class BoxPlacementModel:
                 )
                 support_exprs.append(support_pq)
 
+            # ... or by a fixed pallet
+            for k, (fx, fy, fz, fw, fl, fh) in enumerate(self.fixed):
+                if pre is not None and k not in pre.fixed_supporters[p]:
+                    continue
+                support_exprs.append(
+                    (self.z[p] == fz + fh) &
+                    (self.x[p] >= fx) &
+                    (self.x[p] + self.eff_wid[p] <= fx + fw) &
+                    (self.y[p] >= fy) &
+                    (self.y[p] + self.eff_len[p] <= fy + fl)
+                )
+
             supported_by_some_q = cpm_any(support_exprs) if support_exprs else False
 
             self.model += on_floor | supported_by_some_q
@@ -165,22 +249,26 @@ class BoxPlacementModel:
           max_x_extent = max_p (x[p] + eff_wid[p])
           max_y_extent = max_p (y[p] + eff_len[p])
           max_used_height = max_p (z[p] + hgt[p])
+        Fixed pallets contribute their (constant) extents.
         """
         n = self.num_boxes
+        fixed_x = [fx + fw for (fx, fy, fz, fw, fl, fh) in self.fixed]
+        fixed_y = [fy + fl for (fx, fy, fz, fw, fl, fh) in self.fixed]
+        fixed_z = [fz + fh for (fx, fy, fz, fw, fl, fh) in self.fixed]
 
         self.model += (
             self.max_x_extent ==
-            max([self.x[p] + self.eff_wid[p] for p in range(n)])
+            max([self.x[p] + self.eff_wid[p] for p in range(n)] + fixed_x)
         )
 
         self.model += (
             self.max_y_extent ==
-            max([self.y[p] + self.eff_len[p] for p in range(n)])
+            max([self.y[p] + self.eff_len[p] for p in range(n)] + fixed_y)
         )
 
         self.model += (
             self.max_used_height ==
-            max([self.z[p] + self.heights[p] for p in range(n)])
+            max([self.z[p] + self.heights[p] for p in range(n)] + fixed_z)
         )
 
     def _add_symmetry_breaking_constraints(self):
@@ -221,9 +309,42 @@ class BoxPlacementModel:
     # ------------------------------------------------------------------
     # Solve
     # ------------------------------------------------------------------
-    def solve(self, **solver_args):
+    def solve(self, hint=None, monitor=None, **solver_args):
         """
         Solve the model.
+        hint:    optional (variables, values) pair used as a solution hint
+                 (warm start), see hint_from_boxes().
+        monitor: optional ortools solution callback with attach(solver) /
+                 detach() (e.g. utils.time_budget.SolveMonitor) that follows
+                 the incumbents and may stop the search early.
         Returns True if a solution is found, False otherwise.
         """
-        return self.model.solve(**solver_args)
\ No newline at end of file
+        if hint is None and monitor is None:
+            return self.model.solve(**solver_args)
+
+        solver = SolverLookup.get(solver_args.pop("solver", None), self.model)
+        if hint is not None:
+            solver.solution_hint(*hint)
+        if monitor is None:
+            return solver.solve(**solver_args)
+
+        monitor.attach(solver)
+        try:
+            return solver.solve(solution_callback=monitor, **solver_args)
+        finally:
+            monitor.detach()
+
+    def hint_from_boxes(self, boxes):
+        """
+        Build a solution hint from a previous placement of the same pallets
+        (Layout rows or box dicts with x, y, z, rot), in model order.
+        Entries fixed by presolve are skipped.
+        """
+        variables, values = [], []
+        for p, b in enumerate(boxes):
+            variables += [self.x[p], self.y[p], self.z[p]]
+            values    += [int(b["x"]), int(b["y"]), int(b["z"])]
+            if hasattr(self.rot[p], "value"):
+                variables.append(self.rot[p])
+                values.append(bool(b["rot"]))
+        return variables, values
\ No newline at end of file
@@ -0,0 +1,70 @@
+# A_build_benchmark.py
+#
+# Build time and peak memory of Model A: CPMpy path vs direct CP-SAT emission.
+#
+#   python -m models.A_build_benchmark
+#
+# Uses the Unix-only resource module, so it is kept out of the model modules.
+
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from cpmpy import SolverLookup
+
+from models.A_box_placement_model import BoxPlacementModel
+from models.A_box_placement_cpsat import CpSatBoxPlacementModel
+
+
+def _random_instance(n, seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = [(120, 80), (120, 100), (115, 115), (114, 114), (115, 108), (77, 77)]
+    picks = rng.integers(0, len(sizes), n)
+    lengths = [sizes[i][0] for i in picks]
+    widths  = [sizes[i][1] for i in picks]
+    heights = rng.choice([66, 88, 89, 120, 230], n).tolist()
+    return lengths, widths, heights
+
+
+def _measure_build(backend, n, W, L, H, BUF):
+    """Build (and, for CPMpy, hand over to OR-Tools) in a fresh process."""
+    lengths, widths, heights = _random_instance(n)
+    start = time.perf_counter()
+    if backend == "cpsat":
+        model = CpSatBoxPlacementModel(lengths, widths, heights, W, L, H, BUF)
+        size = len(model.model.proto.constraints)
+    else:
+        model = BoxPlacementModel(lengths, widths, heights, W, L, H, BUF)
+        solver = SolverLookup.get("ortools", model.model)
+        size = len(solver.ort_model.proto.constraints)
+    seconds = time.perf_counter() - start
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return seconds, peak_mb, size
+
+
+def benchmark_build(sizes=(25, 50, 100, 200), W=235, L=1203, H=270, BUF=5):
+    """
+    Build time and peak memory (max RSS) of both backends per instance size.
+    Every measurement runs in its own process so peaks do not mix.
+    """
+    rows = []
+    for n in sizes:
+        for backend in ("cpmpy", "cpsat"):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                seconds, peak_mb, size = pool.submit(
+                    _measure_build, backend, n, W, L, H, BUF
+                ).result()
+            rows.append((n, backend, seconds, peak_mb, size))
+            print(f"n={n:4d}  {backend:6s}  build {seconds:7.2f}s  "
+                  f"peak {peak_mb:8.1f} MB  constraints {size}")
+    return rows
+
+
+# Simple manual benchmark
+if __name__ == "__main__":
+    benchmark_build()
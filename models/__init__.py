@@ -0,0 +1,11 @@
+# models/__init__.py
+
+from models.A_box_placement_model import BoxPlacementModel
+from models.A_box_placement_cpsat import CpSatBoxPlacementModel
+
+
+# Model A implementations by backend name: CPMpy model or direct CP-SAT emission
+MODEL_A_BACKENDS = {
+    "cpmpy": BoxPlacementModel,
+    "cpsat": CpSatBoxPlacementModel,
+}
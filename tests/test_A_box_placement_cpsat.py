@@ -0,0 +1,54 @@
+# tests/test_A_box_placement_cpsat.py
+
+import random
+
+import pytest
+
+from models import BoxPlacementModel, CpSatBoxPlacementModel
+from utils.layout import Layout
+from utils.presolve import presolve_instance
+from utils.validate_layout import validate_layout
+
+
+W, L, H = 235, 1203, 270
+BUF = 5
+
+SIZES = [(120, 80), (120, 100), (115, 115), (100, 60)]
+
+
+def _order(seed, n=5):
+    rng = random.Random(seed)
+    picks = [rng.choice(SIZES) for _ in range(n)]
+    heights = [rng.choice([60, 100, 150]) for _ in range(n)]
+    return [l for l, _ in picks], [w for _, w in picks], heights
+
+
+FIXED = [
+    dict(x=0,   y=0, z=0, w=80,  l=120, h=100),
+    dict(x=115, y=0, z=0, w=100, l=120, h=120),
+]
+
+
+def _solve(model_cls, lengths, widths, heights, presolve, fixed):
+    presolved = None
+    if presolve:
+        presolved = presolve_instance(lengths, widths, heights, W, L, H, BUF, fixed_boxes=fixed)
+    model = model_cls(lengths, widths, heights, W, L, H, BUF,
+                      presolved=presolved, fixed_boxes=fixed)
+    assert model.solve(time_limit=60)
+    layout = Layout.from_model(model)
+    if fixed is not None:
+        layout = layout.concat(Layout.from_boxes(FIXED, W, L, H, BUF))
+    assert validate_layout(layout) == []
+    # Same as the model objective: its bounding box includes the fixed pallets
+    return layout.objective()
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("presolve", [False, True])
+@pytest.mark.parametrize("fixed", [None, FIXED])
+def test_backends_agree(seed, presolve, fixed):
+    order = _order(seed)
+    obj_cpmpy = _solve(BoxPlacementModel, *order, presolve, fixed)
+    obj_cpsat = _solve(CpSatBoxPlacementModel, *order, presolve, fixed)
+    assert obj_cpmpy == obj_cpsat
@@ -3,6 +3,7 @@
 import time
 
 from models.A_box_placement_model import BoxPlacementModel
+from utils.layout import Layout
 from utils.parse_xlsx import parse_pallet_excel, parse_pallet_excel_and_dump_csv
 
 
@@ -36,25 +37,15 @@ def run_box_placement_test():
 
     if solved:
         print("\nModel solved successfully!")
-        obj = 1000 * model.max_used_height.value() \
-              + model.max_y_extent.value() \
-              + model.max_x_extent.value()
-        print(f"Objective = {obj}")
-        print(f"max_used_height = {model.max_used_height.value()}")
-        print(f"max_x_extent    = {model.max_x_extent.value()}")
-        print(f"max_y_extent    = {model.max_y_extent.value()}")
+        layout = Layout.from_model(model, pallets_data)
+        print(f"Objective = {layout.objective()}")
+        print(f"max_used_height = {layout.max_used_height}")
+        print(f"max_x_extent    = {layout.max_x_extent}")
+        print(f"max_y_extent    = {layout.max_y_extent}")
 
         print("\nFirst few boxes (idx, x, y, z, eff_len, eff_wid, h):")
-        for p in range(min(10, model.num_boxes)):
-            print(
-                p,
-                model.x[p].value(),
-                model.y[p].value(),
-                model.z[p].value(),
-                model.eff_len[p].value(),
-                model.eff_wid[p].value(),
-                model.heights[p],
-            )
+        for p, b in enumerate(layout[:10]):
+            print(p, b["x"], b["y"], b["z"], b["l"], b["w"], b["h"])
     else:
         print("\nNo solution found.")
 
@@ -70,33 +61,30 @@ def print_model_solution(model):
         print("No solution values available (variables have no .value()).")
         return
 
+    layout = Layout.from_model(model)
+
     print("\n================= SOLUTION SUMMARY =================")
 
-    obj = (
-        1000 * model.max_used_height.value()
-        + model.max_y_extent.value()
-        + model.max_x_extent.value()
-    )
-    print(f"Objective value: {obj}")
-    print(f"max_used_height = {model.max_used_height.value()}")
-    print(f"max_x_extent    = {model.max_x_extent.value()}")
-    print(f"max_y_extent    = {model.max_y_extent.value()}")
+    print(f"Objective value: {layout.objective()}")
+    print(f"max_used_height = {layout.max_used_height}")
+    print(f"max_x_extent    = {layout.max_x_extent}")
+    print(f"max_y_extent    = {layout.max_y_extent}")
 
     print("\n================= PER-BOX VARIABLES =================")
     header = f"{'idx':>3} | {'x':>4} {'y':>4} {'z':>4} | {'rot':>3} | {'eff_len':>7} {'eff_wid':>7} {'height':>6}"
     print(header)
     print("-" * len(header))
 
-    for p in range(model.num_boxes):
+    for p, b in enumerate(layout):
         print(
             f"{p:3d} | "
-            f"{model.x[p].value():4d} "
-            f"{model.y[p].value():4d} "
-            f"{model.z[p].value():4d} | "
-            f"{int(model.rot[p].value()):3d} | "
-            f"{model.eff_len[p].value():7d} "
-            f"{model.eff_wid[p].value():7d} "
-            f"{model.heights[p]:6d}"
+            f"{b['x']:4d} "
+            f"{b['y']:4d} "
+            f"{b['z']:4d} | "
+            f"{b['rot']:3d} | "
+            f"{b['l']:7d} "
+            f"{b['w']:7d} "
+            f"{b['h']:6d}"
         )
 
     print("====================================================\n")
\ No newline at end of file
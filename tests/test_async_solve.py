@@ -0,0 +1,67 @@
+# tests/test_async_solve.py
+
+import asyncio
+import time
+
+from models.A_box_placement_cpsat import CpSatBoxPlacementModel
+from utils.async_solve import SolveJob
+
+
+def test_cancel_stops_solver():
+    lengths, widths, heights = [120] * 8, [80] * 8, [100] * 8
+    model = CpSatBoxPlacementModel(lengths, widths, heights, 235, 1203, 270, 5)
+
+    async def run():
+        job = SolveJob(model, time_limit=60, rel_gap=0.0).start()
+        job.cancel()          # before CP-SAT has started searching
+        t0 = time.perf_counter()
+        await job
+        return job, time.perf_counter() - t0
+
+    job, waited = asyncio.run(run())
+    assert job.stop_reason == "cancelled"
+    assert waited < 5
+
+
+
+def _write_order(path):
+    # 26 pallets of four types: CP-SAT keeps improving the bound for well
+    # over a minute, so the solve only ends early if it is really cancelled
+    import pandas as pd
+
+    pd.DataFrame({
+        "Pallet size": ["A", "B", "C", "D"],
+        "Lenght": [120, 120, 100, 80],
+        "Width": [80, 100, 100, 60],
+        "Height": [100, 120, 80, 150],
+        "Pallet type": ["EUR", "IND", "SQ", "HALF"],
+        "# pallets": [8, 6, 6, 6],
+    }).to_excel(path, index=False)
+    return str(path)
+
+
+def test_cancel_while_streaming_events(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.async_solve import run_box_placement_async
+
+    path = _write_order(tmp_path / "order.xlsx")
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    async def run():
+        first_event = asyncio.Event()
+        task = asyncio.ensure_future(run_box_placement_async(
+            path, 235, 1203, 270, 5, time_limit=30, rel_gap=0.0, backend="cpsat",
+            executor=executor, on_progress=lambda e: first_event.set()
+        ))
+        await first_event.wait()
+        task.cancel()           # the task is inside the events() loop here
+        t0 = time.perf_counter()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # Keep the loop running until the solver thread is done
+        await asyncio.get_running_loop().run_in_executor(None, executor.shutdown, True)
+        return time.perf_counter() - t0
+
+    assert asyncio.run(run()) < 10
@@ -0,0 +1,64 @@
+# tests/test_container_sweep.py
+
+import utils.container_sweep as container_sweep
+from utils.container_sweep import sweep_containers
+
+
+def test_prunes_without_solving():
+    lengths, widths, heights = [120, 120], [80, 80], [150, 150]
+    specs = [
+        {"name": "low",    "W": 235, "L": 1203, "H": 100, "BUF": 5},
+        {"name": "narrow", "W": 70,  "L": 1203, "H": 270, "BUF": 5},
+        {"name": "short",  "W": 235, "L": 80,   "H": 270, "BUF": 5},
+    ]
+    results = sweep_containers((lengths, widths, heights, []), specs)
+
+    status = {r["spec"]["name"]: r["status"] for r in results}
+    assert status == {"low": "pruned", "narrow": "pruned", "short": "infeasible"}
+    assert all(r["layout"] is None for r in results)
+
+
+def test_solves_and_ranks_feasible_specs():
+    lengths, widths, heights = [120, 120, 100, 100], [80, 80, 100, 100], [100, 100, 80, 80]
+    pallets_data = [
+        {"pallet_size": "EUR", "length": 120, "width": 80, "height": 100, "pallet_type": "A", "count": 2},
+        {"pallet_size": "SQ", "length": 100, "width": 100, "height": 80, "pallet_type": "B", "count": 2},
+    ]
+    specs = [
+        {"name": "large", "W": 235, "L": 1203, "H": 270, "BUF": 5},
+        {"name": "small", "W": 235, "L": 300,  "H": 270, "BUF": 5},
+    ]
+    results = sweep_containers((lengths, widths, heights, pallets_data), specs, time_limit=2)
+
+    assert [r["spec"]["name"] for r in results] == ["small", "large"]
+    for r in results:
+        assert r["layout"] is not None and len(r["layout"]) == 4
+        assert r["status"] in ("optimal", "gap", "stalled", "time_limit")
+        assert r["free_length"] == r["layout"].free_length() >= 0
+        assert r["solve_time"] > 0
+    assert results[0]["fill_rate"] > results[1]["fill_rate"]
+    assert sorted(results[0]["layout"]["type"].tolist()) == [0, 0, 1, 1]
+
+
+def test_geometry_computed_once(monkeypatch):
+    calls = []
+    geometry_cls = container_sweep.OrderGeometry
+
+    def counting_geometry(*args):
+        calls.append(args)
+        return geometry_cls(*args)
+
+    monkeypatch.setattr(container_sweep, "OrderGeometry", counting_geometry)
+    lengths, widths, heights = [120, 120], [80, 80], [150, 150]
+    pallets_data = [
+        {"pallet_size": "EUR", "length": 120, "width": 80, "height": 150, "pallet_type": "A", "count": 2},
+    ]
+    specs = [
+        {"name": "short", "W": 235, "L": 80,  "H": 270, "BUF": 5},
+        {"name": "long",  "W": 235, "L": 300, "H": 270, "BUF": 5},
+    ]
+    results = sweep_containers((lengths, widths, heights, pallets_data), specs, time_limit=2)
+
+    assert [r["spec"]["name"] for r in results] == ["long", "short"]
+    assert results[1]["status"] == "infeasible"
+    assert len(calls) == 1
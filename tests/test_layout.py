@@ -0,0 +1,46 @@
+# tests/test_layout.py
+
+import numpy as np
+
+from utils.layout import Layout
+
+
+W, L, H = 235, 1203, 270
+BUF = 5
+
+BOXES = [
+    dict(id=1, type=0, x=0,  y=0,   z=0,   w=80,  l=120, h=100, rot=0),
+    dict(id=2, type=1, x=85, y=0,   z=0,   w=120, l=80,  h=150, rot=1),
+    dict(id=3, type=0, x=0,  y=0,   z=100, w=80,  l=120, h=100, rot=0),
+    dict(id=4, type=2, x=0,  y=125, z=0,   w=100, l=100, h=90,  rot=0),
+]
+
+
+def _assert_same(a, b):
+    assert (a.W, a.L, a.H, a.BUF) == (b.W, b.L, b.H, b.BUF)
+    assert np.array_equal(a.boxes, b.boxes)
+    assert a.objective() == b.objective()
+
+
+def test_round_trips(tmp_path):
+    layout = Layout.from_boxes(BOXES, W, L, H, BUF)
+
+    stem = str(tmp_path / "layout")
+    layout.save(stem)
+    mapped = Layout.load(stem)
+    # Read-only view of the mapped file, not a copy
+    assert not mapped.boxes.flags.writeable and not mapped.boxes.flags.owndata
+    _assert_same(layout, mapped)
+    _assert_same(layout, Layout.load(stem, mmap=False))
+
+    _assert_same(layout, Layout.from_json(layout.to_json()))
+
+    path = layout.save_npz(str(tmp_path / "layout.npz"))
+    _assert_same(layout, Layout.load_npz(path))
+
+
+def test_empty_round_trip(tmp_path):
+    layout = Layout.empty(0, W, L, H, BUF)
+    _assert_same(layout, Layout.from_json(layout.to_json()))
+    path = layout.save_npz(str(tmp_path / "empty.npz"))
+    _assert_same(layout, Layout.load_npz(path))
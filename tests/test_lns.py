@@ -0,0 +1,99 @@
+# tests/test_lns.py
+
+import time
+
+import numpy as np
+import pytest
+
+from utils.lns import greedy_layout, close_upwards, solve_neighbourhood, run_lns
+from utils.validate_layout import validate_layout
+
+
+W, L, H = 235, 1203, 270
+BUF = 5
+
+# 12 pallets of three types
+LENGTHS = [120] * 4 + [120] * 4 + [100] * 4
+WIDTHS  = [80] * 4 + [100] * 4 + [100] * 4
+HEIGHTS = [100] * 4 + [120] * 4 + [80] * 4
+
+
+def _start():
+    layout = greedy_layout(LENGTHS, WIDTHS, HEIGHTS, W, L, H, BUF)
+    assert layout is not None
+    return layout
+
+
+def test_greedy_layout_is_valid():
+    layout = _start()
+    assert len(layout) == len(LENGTHS)
+    assert validate_layout(layout) == []
+    # Does not fit: everything is returned as None, not an invalid layout
+    assert greedy_layout([120] * 200, [100] * 200, [200] * 200, W, L, H, BUF) is None
+
+
+def test_close_upwards():
+    layout = _start()
+    on_top = np.flatnonzero(layout["z"] > 0)
+    below = [int(np.flatnonzero(
+        (layout["z"] + layout["h"] == layout["z"][p]) &
+        (layout["x"] == layout["x"][p]) & (layout["y"] == layout["y"][p])
+    )[0]) for p in on_top]
+
+    mask = np.zeros(len(layout), dtype=bool)
+    mask[below[0]] = True
+    closed = close_upwards(layout, mask)
+    assert closed[on_top[0]]
+
+
+@pytest.mark.parametrize("backend", ["cpmpy", "cpsat"])
+def test_solve_neighbourhood_keeps_fixed_rows(backend):
+    layout = _start()
+    free_idx = np.flatnonzero(close_upwards(layout, layout["y"] == layout["y"].max()))
+    new = solve_neighbourhood(layout, free_idx, time_limit=5, backend=backend)
+
+    assert new is not None
+    assert validate_layout(new) == []
+    fixed = np.ones(len(layout), dtype=bool)
+    fixed[free_idx] = False
+    assert np.array_equal(new.boxes[fixed], layout.boxes[fixed])
+    assert new.objective() <= layout.objective()
+
+    # Deadline already passed once the model is built: no solve at all
+    assert solve_neighbourhood(layout, free_idx, backend=backend, deadline=time.time()) is None
+
+
+@pytest.mark.parametrize("backend", ["cpmpy", "cpsat"])
+def test_solve_neighbourhood_single_pallet(backend):
+    layout = _start()
+    top = int(np.argmax(layout["z"] + layout["h"]))
+    new = solve_neighbourhood(layout, np.array([top]), time_limit=5, backend=backend)
+
+    assert new is not None
+    assert validate_layout(new) == []
+    assert new.objective() <= layout.objective()
+
+
+@pytest.mark.parametrize("backend", ["cpmpy", "cpsat"])
+def test_run_lns_never_worse(backend):
+    layout = _start()
+    best, stats = run_lns(layout, time_budget=4, sub_time_limit=1, max_free=4,
+                          backend=backend, verbose=False)
+
+    assert validate_layout(best) == []
+    assert best.objective() <= layout.objective()
+    objectives = [obj for _, obj in stats["history"]]
+    assert objectives == sorted(objectives, reverse=True)
+    assert stats["time"] < 4 + 2
+
+
+def test_run_lns_singleton_type():
+    # One square pallet next to four EUR pallets: "pallet_type" often frees just it
+    lengths, widths, heights = [120] * 4 + [100], [80] * 4 + [100], [100] * 4 + [80]
+    layout = greedy_layout(lengths, widths, heights, W, L, H, BUF)
+    best, stats = run_lns(layout, time_budget=2, sub_time_limit=1, max_free=1,
+                          strategies=("pallet_type",), verbose=False)
+
+    assert stats["iterations"] > 0
+    assert validate_layout(best) == []
+    assert best.objective() <= layout.objective()
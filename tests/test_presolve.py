@@ -0,0 +1,79 @@
+# tests/test_presolve.py
+
+import pytest
+
+from utils.presolve import presolve_instance, InfeasibleInstanceError, OrderGeometry
+
+
+W, L, H = 235, 1203, 270
+BUF = 5
+
+
+def test_fixed_and_square_rotations():
+    # 0: 120x80 fits both ways, 1: 240 long cannot lie across W = 235, 2: square
+    lengths = [120, 240, 100]
+    widths  = [80, 100, 100]
+    heights = [100, 100, 100]
+
+    inst = presolve_instance(lengths, widths, heights, W, L, H, BUF)
+
+    assert inst.fixed_rot[0] is None
+    assert inst.fixed_rot[1] == 0          # 240 cannot lie along X (W = 235)
+    assert inst.fixed_rot[2] == 0
+    assert inst.is_square == [False, False, True]
+
+
+def test_stacking_and_floor():
+    # 0 and 1 together are taller than H; 2 is small and can sit on either
+    lengths = [120, 120, 60]
+    widths  = [80, 80, 40]
+    heights = [200, 150, 50]
+
+    inst = presolve_instance(lengths, widths, heights, W, L, H, BUF)
+
+    assert not inst.can_stack(0, 1)
+    assert inst.can_support(0, 2) and inst.can_support(1, 2)
+    assert not inst.can_support(2, 0)      # footprint of 0 never fits on 2
+    assert inst.must_floor == [True, True, False]
+    assert not inst.can_be_below(2, 0)     # 0 is pinned to the floor
+
+
+def test_infeasible_orders_fail_fast():
+    with pytest.raises(InfeasibleInstanceError):
+        presolve_instance([120], [80], [300], W, L, H, BUF)          # too tall
+
+    with pytest.raises(InfeasibleInstanceError):
+        presolve_instance([1300], [80], [100], W, L, H, BUF)         # too long
+
+    # 40 tall pallets that can never stack, each 120x100 on a 235x1203 floor
+    n = 40
+    with pytest.raises(InfeasibleInstanceError):
+        presolve_instance([120] * n, [100] * n, [200] * n, W, L, H, BUF)
+
+
+def test_fixed_supporters():
+    fixed = [
+        dict(x=0,   y=0, z=0, w=80, l=120, h=100),    # can carry either pallet
+        dict(x=100, y=0, z=0, w=40, l=60,  h=100),    # too small
+        dict(x=0,   y=0, z=0, w=80, l=120, h=250),    # too tall to carry anything
+    ]
+    inst = presolve_instance([120, 120], [80, 80], [150, 150], W, L, H, BUF, fixed_boxes=fixed)
+
+    assert inst.fixed_supporters == [{0}, {0}]
+    assert inst.supporters == [set(), set()]       # 150 + 150 > H
+    assert inst.must_floor == [False, False]
+
+
+def test_shared_geometry_matches_fresh_presolve():
+    # 240 long is only allowed lengthwise in the 235 wide container
+    lengths = [120, 240, 100, 60]
+    widths  = [80, 100, 100, 40]
+    heights = [120, 100, 100, 50]
+    geometry = OrderGeometry(lengths, widths, heights)
+
+    for (w, l, h) in [(W, L, H), (248, 1360, 270), (235, 590, 239)]:
+        fresh = presolve_instance(lengths, widths, heights, w, l, h, BUF)
+        shared = presolve_instance(lengths, widths, heights, w, l, h, BUF, geometry=geometry)
+        assert shared.supporters == fresh.supporters
+        assert shared.fixed_rot == fresh.fixed_rot
+        assert shared.must_floor == fresh.must_floor
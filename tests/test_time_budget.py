@@ -0,0 +1,84 @@
+# tests/test_time_budget.py
+
+import time
+
+import pytest
+
+from models.A_box_placement_model import BoxPlacementModel
+from models.A_box_placement_cpsat import CpSatBoxPlacementModel
+from utils.time_budget import TimeBudget, SolveMonitor, A_BASE_TIME, A_TIME_PER_BOX
+
+
+W, L, H = 235, 1203, 270
+BUF = 5
+
+# Keeps improving the bound for well over a minute
+HARD = (
+    [120] * 8 + [120] * 6 + [100] * 6 + [80] * 6,
+    [80] * 8 + [100] * 6 + [100] * 6 + [60] * 6,
+    [100] * 8 + [120] * 6 + [80] * 6 + [150] * 6,
+)
+
+
+def test_time_budget_stages_and_allotment():
+    budget = TimeBudget(100)
+    with budget.stage("A"):
+        time.sleep(0.05)
+    with budget.stage("A"):
+        pass
+    report = budget.report()
+    assert report["A"] >= 0.05 and report["deadline"] == 100.0
+    assert budget.remaining() <= 100 - 0.05
+
+    # Large order: everything except the reserve for Model B
+    limit = budget.allot_A(num_boxes=200, num_types=5)
+    assert budget.remaining() - 1.5 < limit < budget.remaining() - 0.5
+    # Small order: capped by its size
+    assert budget.allot_A(num_boxes=2) == A_BASE_TIME + 2 * A_TIME_PER_BOX
+
+
+@pytest.mark.parametrize("model_cls", [BoxPlacementModel, CpSatBoxPlacementModel])
+def test_monitor_optimal(model_cls):
+    model = model_cls([120, 120], [80, 80], [100, 100], W, L, H, BUF)
+    monitor = SolveMonitor(rel_gap=-1.0)       # never stop on the gap
+    assert model.solve(time_limit=30, monitor=monitor)
+    assert monitor.stop_reason == "optimal"
+    assert monitor.history
+
+
+@pytest.mark.parametrize("model_cls", [BoxPlacementModel, CpSatBoxPlacementModel])
+def test_monitor_gap(model_cls):
+    model = model_cls([120, 120], [80, 80], [100, 100], W, L, H, BUF)
+    monitor = SolveMonitor()
+    assert model.solve(time_limit=30, monitor=monitor)
+    assert monitor.stop_reason == "gap"
+
+
+def test_monitor_time_limit_and_stall():
+    model = CpSatBoxPlacementModel(*HARD, W, L, H, BUF)
+
+    # Whether 1 s is enough for a first incumbent depends on the machine
+    monitor = SolveMonitor(rel_gap=0.0)
+    model.solve(time_limit=1, monitor=monitor)
+    assert monitor.stop_reason == "time_limit"
+
+    monitor = SolveMonitor(rel_gap=0.0, stall_time=0.5)
+    t0 = time.perf_counter()
+    assert model.solve(time_limit=30, monitor=monitor)
+    assert monitor.stop_reason == "stalled"
+    assert time.perf_counter() - t0 < 10
+
+
+def test_monitor_no_solution():
+    # Two 200-wide pallets that can neither stand side by side nor stack
+    model = CpSatBoxPlacementModel([200, 200], [150, 150], [200, 200], 235, 150, H, BUF)
+    monitor = SolveMonitor()
+    assert not model.solve(time_limit=10, monitor=monitor)
+    assert monitor.stop_reason == "infeasible"
+    assert monitor.history == [] and monitor.gap() == 1.0
+
+    # Time limit before the first incumbent
+    model = CpSatBoxPlacementModel(*HARD, W, L, H, BUF)
+    monitor = SolveMonitor()
+    assert not model.solve(time_limit=0.0, monitor=monitor)
+    assert monitor.stop_reason == "time_limit"
@@ -0,0 +1,64 @@
+# tests/test_tuning.py
+
+import pandas as pd
+
+from utils.tuning import (
+    instance_class, save_profile, select_params, run_tuning, solver_args_from_config,
+    _time_to_target
+)
+
+
+W, L, H = 235, 1203, 270
+BUF = 5
+CONTAINER = {"W": W, "L": L, "H": H, "BUF": BUF}
+
+
+def test_select_params_by_class(tmp_path):
+    path = str(tmp_path / "profile.json")
+    small = ([120] * 4, [80] * 4, [100] * 4)
+    large = ([120] * 80, [80] * 80, [100 + i % 10 for i in range(80)])
+    assert instance_class(*small) == "small/uniform"
+    assert instance_class(*large) == "large/diverse"
+
+    # No profile yet: CP-SAT defaults
+    assert select_params(*small, W, L, H, BUF, path=path) == {}
+
+    config = {"num_search_workers": 4, "presolve_effort": "off", "search_branching": "FIXED_SEARCH"}
+    save_profile({"container": CONTAINER, "classes": {"small/uniform": {"config": config}}}, path)
+
+    args = select_params(*small, W, L, H, BUF, path=path)
+    assert args["num_search_workers"] == 4
+    assert args["cp_model_presolve"] is False
+    assert "presolve_effort" not in args
+    assert select_params(*large, W, L, H, BUF, path=path) == {}
+
+    # Tuned for another container: CP-SAT defaults
+    assert select_params(*small, W, 590, 239, BUF, path=path) == {}
+
+
+def test_time_to_target():
+    history = [(0.1, 300.0), (0.5, 205.0), (2.0, 200.0)]
+    assert _time_to_target(history, 200 * 1.01, 10) == 2.0
+    assert _time_to_target(history, 210, 10) == 0.5
+    assert _time_to_target(history, 100, 10) == 10
+
+
+def test_run_tuning_writes_profile(tmp_path):
+    order = str(tmp_path / "order.xlsx")
+    pd.DataFrame({
+        "Pallet size": ["EUR", "SQ"], "Lenght": [120, 100], "Width": [80, 100],
+        "Height": [100, 80], "Pallet type": ["A", "B"], "# pallets": [3, 2],
+    }).to_excel(order, index=False)
+    path = str(tmp_path / "profile.json")
+
+    configs = [{}, {"num_search_workers": 1, "presolve_effort": "light"}]
+    profile = run_tuning([order], W, L, H, BUF, configs=configs, time_limit=2,
+                         path=path, verbose=False)
+
+    assert profile["container"] == CONTAINER
+    entry = profile["classes"]["small/uniform"]
+    assert entry["config"] in configs
+    assert entry["score"] == 1.0 and 0 <= entry["time"] <= 2
+    assert len(profile["results"]) == 2
+    assert select_params([120] * 3 + [100] * 2, [80] * 3 + [100] * 2, [100] * 3 + [80] * 2,
+                         W, L, H, BUF, path=path) == solver_args_from_config(entry["config"])
@@ -0,0 +1,65 @@
+# tests/test_validate_layout.py
+
+import itertools
+import random
+
+from utils.layout import Layout
+from utils.validate_layout import validate_layout, _grid_layout
+
+
+W, L, H = 235, 1203, 270
+BUF = 5
+
+
+def _rules(violations):
+    return sorted((v["rule"], tuple(v["ids"])) for v in violations)
+
+
+def test_valid_grid():
+    assert validate_layout(_grid_layout(3, 4, 2)) == []
+
+
+def test_each_rule():
+    boxes = [
+        dict(id=1, x=0,   y=0,   z=0,   w=80, l=120, h=100),
+        dict(id=2, x=82,  y=0,   z=0,   w=80, l=120, h=100),   # 2 < BUF from 1 in x
+        dict(id=3, x=0,   y=0,   z=100, w=80, l=100, h=50),    # stands on 1
+        dict(id=4, x=100, y=300, z=20,  w=80, l=120, h=100),   # floating
+        dict(id=5, x=200, y=300, z=0,   w=80, l=120, h=100),   # sticks out in x
+    ]
+    layout = Layout.from_boxes(boxes, W, L, H, BUF)
+
+    assert _rules(validate_layout(layout)) == [
+        ("bounds", (5,)),
+        ("separation", (1, 2)),
+        ("support", (4,)),
+    ]
+
+
+def _brute_force_separation(boxes, B):
+    bad = set()
+    for P, Q in itertools.combinations(boxes, 2):
+        sep_x = P["x"] + P["w"] + B <= Q["x"] or Q["x"] + Q["w"] + B <= P["x"]
+        sep_y = P["y"] + P["l"] + B <= Q["y"] or Q["y"] + Q["l"] + B <= P["y"]
+        sep_z = P["z"] + P["h"] <= Q["z"] or Q["z"] + Q["h"] <= P["z"]
+        if not (sep_x or sep_y or sep_z):
+            bad.add(frozenset((P["id"], Q["id"])))
+    return bad
+
+
+def test_separation_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(100):
+        boxes = [
+            dict(id=i + 1,
+                 x=rng.randint(0, 150), y=rng.choice([0, 50, rng.randint(0, 400)]),
+                 z=rng.choice([0, 0, 50]),
+                 w=rng.randint(10, 80), l=rng.randint(10, 120), h=50)
+            for i in range(rng.randint(0, 25))
+        ]
+        found = {
+            frozenset(v["ids"])
+            for v in validate_layout(boxes, W, L, H, BUF)
+            if v["rule"] == "separation"
+        }
+        assert found == _brute_force_separation(boxes, BUF)
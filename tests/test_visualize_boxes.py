@@ -0,0 +1,38 @@
+# tests/test_visualize_boxes.py
+
+import json
+import os
+
+from utils.visualize_boxes import export_layout, save_boxes_html
+
+
+W, L, H = 235, 1203, 270
+
+BOXES = [
+    dict(id=1, x=0,  y=0, z=0,   w=80, l=120, h=100),
+    dict(id=2, x=85, y=0, z=0,   w=80, l=120, h=100),
+    dict(id=3, x=0,  y=0, z=100, w=80, l=120, h=50),
+]
+
+
+def test_export_png_and_html(tmp_path):
+    stem = str(tmp_path / "layout")
+    paths = export_layout(W, L, H, BOXES, stem)
+
+    assert paths == [f"{stem}.png", f"{stem}.html"]
+    for p in paths:
+        assert os.path.getsize(p) > 0
+    with open(f"{stem}.png", "rb") as f:
+        assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+def test_html_embeds_boxes(tmp_path):
+    path = save_boxes_html(W, L, H, BOXES, str(tmp_path / "layout.html"), title="<order>")
+    with open(path, encoding="utf-8") as f:
+        page = f.read()
+
+    assert "<title>&lt;order&gt;</title>" in page
+    line = next(l for l in page.splitlines() if l.startswith("const DATA = "))
+    data = json.loads(line[len("const DATA = "):].rstrip(";"))
+    assert data["container"] == [W, L, H]
+    assert data["boxes"] == [[b[k] for k in ("id", "x", "y", "z", "w", "l", "h")] for b in BOXES]
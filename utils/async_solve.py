@@ -0,0 +1,213 @@
+# async_solve.py
+#
+# asyncio front end for Model A.
+#
+#   job = SolveJob(model, time_limit=30).start()
+#   async for event in job.events():
+#       print(event)                    # {"t", "objective", "bound", "gap"}
+#   solved = await job
+#
+# The solve runs in an executor thread (CP-SAT releases the GIL while it
+# searches), so the event loop stays responsive. Cancelling the task that
+# awaits the job, or calling job.cancel(), stops CP-SAT through SolveMonitor;
+# the job then ends with stop_reason "cancelled" and keeps the best incumbent
+# found so far. SolveSlot cancels the previous solve when a new one is
+# submitted, so a superseded request does not keep the cores busy.
+
+import asyncio
+
+from utils.layout import Layout
+from utils.parse_xlsx import parse_pallet_excel
+from utils.pipeline import _build_modelA
+from utils.time_budget import SolveMonitor
+from utils.validate_layout import validate_layout, print_violations
+
+
+class SolveJob:
+    """
+    One Model A solve (either backend) as an awaitable.
+
+    model        BoxPlacementModel or CpSatBoxPlacementModel
+    executor     a thread pool (None = the loop's default executor);
+                 the monitor lives in this process, so no process pools
+    rel_gap, stall_time   passed to SolveMonitor
+    solver_args  passed to model.solve (solver=..., num_search_workers=...)
+    """
+
+    def __init__(self, model, time_limit=60, rel_gap=1e-3, stall_time=None, executor=None,
+                 **solver_args):
+        self.model = model
+        self.time_limit = time_limit
+        self.executor = executor
+        self.solver_args = solver_args
+        self.monitor = SolveMonitor(rel_gap=rel_gap, stall_time=stall_time,
+                                    on_solution=self._on_solution)
+        self._loop = None
+        self._future = None
+        self._events = None
+
+    def start(self):
+        """Submit the solve to the executor (needs a running event loop)."""
+        assert self._future is None, "SolveJob already started"
+        self._loop = asyncio.get_running_loop()
+        self._events = asyncio.Queue()
+        self._future = self._loop.run_in_executor(self.executor, self._run)
+        self._future.add_done_callback(lambda _: self._events.put_nowait(None))
+        return self
+
+    def _run(self):
+        return self.model.solve(time_limit=self.time_limit, monitor=self.monitor,
+                                **self.solver_args)
+
+    def _on_solution(self, t, obj, bound):
+        # Called from the solver thread
+        event = {"t": t, "objective": obj, "bound": bound, "gap": self.monitor.gap()}
+        try:
+            self._loop.call_soon_threadsafe(self._events.put_nowait, event)
+        except RuntimeError:
+            # Event loop already closed: nobody is listening any more
+            pass
+
+    async def events(self):
+        """Yield one event per improving solution until the solve ends."""
+        if self._future is None:
+            self.start()
+        try:
+            while True:
+                event = await self._events.get()
+                if event is None:
+                    return
+                yield event
+        except asyncio.CancelledError:
+            await self.stop()
+            raise
+
+    def cancel(self):
+        """Ask CP-SAT to stop; awaiting the job then returns shortly after."""
+        self.monitor.stop("cancelled")
+
+    async def stop(self):
+        """Cancel and wait until the solver thread has finished."""
+        self.cancel()
+        if self._future is not None:
+            await asyncio.wait([self._future])
+
+    def done(self):
+        return self._future is not None and self._future.done()
+
+    @property
+    def stop_reason(self):
+        return self.monitor.stop_reason
+
+    def __await__(self):
+        return self._wait().__await__()
+
+    async def _wait(self):
+        if self._future is None:
+            self.start()
+        try:
+            # shield: cancelling the awaiting task must not just drop the
+            # executor future while the solver thread keeps running
+            return await asyncio.shield(self._future)
+        except asyncio.CancelledError:
+            await self.stop()
+            raise
+
+
+class SolveSlot:
+    """
+    Holds at most one running solve. Submitting a new one cancels the
+    previous task, which stops its solver before the new one starts searching.
+
+        slot = SolveSlot()
+        task = slot.submit(run_box_placement_async(path, W, L, H, BUF))
+    """
+
+    def __init__(self):
+        self._task = None
+
+    def submit(self, coro):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = asyncio.ensure_future(coro)
+        return self._task
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+async def run_box_placement_async(excel_path, W, L, H, BUF, solver="ortools", time_limit=60,
+                                  presolve=True, backend="cpmpy", rel_gap=1e-3, stall_time=None,
+                                  on_progress=None, executor=None, **solver_args):
+    """
+    Async version of run_box_placement. Parsing and model building also run
+    in the executor. on_progress(event) is called on the event loop for every
+    improving solution (see SolveJob.events).
+    Returns (model, layout, pallets_data) if solved, else (None, None, pallets_data).
+    Cancelling the task stops the solver; a cancellation during the build
+    discards the model and never starts the solve.
+    """
+    loop = asyncio.get_running_loop()
+
+    lengths, widths, heights, pallets_data = await loop.run_in_executor(
+        executor, parse_pallet_excel, excel_path
+    )
+    model = await loop.run_in_executor(
+        executor,
+        lambda: _build_modelA(lengths, widths, heights, W, L, H, BUF,
+                              presolve=presolve, backend=backend)
+    )
+    if model is None:
+        return None, None, pallets_data
+
+    job = SolveJob(model, time_limit=time_limit, rel_gap=rel_gap, stall_time=stall_time,
+                   executor=executor, solver=solver, **solver_args).start()
+    try:
+        if on_progress is not None:
+            async for event in job.events():
+                on_progress(event)
+        solved = await job
+    except asyncio.CancelledError:
+        # Also when the cancellation hits while streaming progress events
+        await job.stop()
+        raise
+
+    print(f"Box placement model: stopped ({job.stop_reason}), gap {job.monitor.gap():.2%}")
+    if not solved:
+        print("Box placement model: no solution")
+        return None, None, pallets_data
+
+    layout = Layout.from_model(model, pallets_data)
+    print_violations(validate_layout(layout))
+    return model, layout, pallets_data
+
+
+# Simple manual test: the first request is superseded after 2 seconds
+if __name__ == "__main__":
+    import time
+
+    async def demo():
+        path = "sample_instances/input_template.xlsx"
+        slot = SolveSlot()
+
+        first = slot.submit(run_box_placement_async(
+            path, 235, 1203, 270, 5, time_limit=60,
+            on_progress=lambda e: print(f"  first:  {e['t']:.2f}s obj {e['objective']:.0f}")
+        ))
+        await asyncio.sleep(2)
+
+        t0 = time.perf_counter()
+        second = slot.submit(run_box_placement_async(
+            path, 235, 1203, 270, 5, time_limit=10,
+            on_progress=lambda e: print(f"  second: {e['t']:.2f}s obj {e['objective']:.0f}")
+        ))
+        try:
+            await first
+        except asyncio.CancelledError:
+            print(f"first request cancelled, solver stopped after {time.perf_counter() - t0:.2f}s")
+
+        _, layout, _ = await second
+        print("second request objective:", layout.objective())
+
+    asyncio.run(demo())
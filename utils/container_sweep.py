@@ -0,0 +1,178 @@
+# container_sweep.py
+#
+# Solve one order against several container specs and compare them.
+#
+#   results = sweep_containers("sample_instances/input_template.xlsx",
+#                              [CONTAINER_SPECS["20ft"], CONTAINER_SPECS["40ft HC"]])
+#   print_sweep(results)
+#
+# The Excel file is parsed once. Specs that cannot hold the order by height,
+# floor area or volume are pruned before any model is built. Presolve runs
+# per spec, but the container-independent footprint containment between the
+# pallets (OrderGeometry) is computed once and shared. The rest is solved
+# concurrently (one process per spec) and ranked by fill rate.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from models import MODEL_A_BACKENDS
+from utils.layout import Layout, box_types_from_pallets_data
+from utils.parse_xlsx import parse_pallet_excel
+from utils.presolve import presolve_instance, InfeasibleInstanceError, OrderGeometry
+from utils.time_budget import SolveMonitor, stall_time_for
+from utils.validate_layout import validate_layout
+
+
+# Inner dimensions in cm: W (x), L (y), H (z)
+CONTAINER_SPECS = {
+    "20ft":          {"name": "20ft",          "W": 235, "L": 590,  "H": 239, "BUF": 5},
+    "40ft":          {"name": "40ft",          "W": 235, "L": 1203, "H": 239, "BUF": 5},
+    "40ft HC":       {"name": "40ft HC",       "W": 235, "L": 1203, "H": 270, "BUF": 5},
+    "truck trailer": {"name": "truck trailer", "W": 248, "L": 1360, "H": 270, "BUF": 5},
+}
+
+
+def _prune_reason(lengths, widths, heights, spec):
+    """Cheap necessary conditions; returns a reason string or None."""
+    W, L, H = spec["W"], spec["L"], spec["H"]
+
+    if max(heights) > H:
+        return f"tallest pallet {max(heights)} > H={H}"
+
+    min_side = max(min(l, w) for l, w in zip(lengths, widths))
+    if min_side > min(W, L):
+        return f"pallet side {min_side} does not fit the {W}x{L} floor"
+
+    volume = sum(l * w * h for l, w, h in zip(lengths, widths, heights))
+    if volume > W * L * H:
+        return f"order volume {volume} > container volume {W * L * H}"
+    return None
+
+
+def _solve_spec(lengths, widths, heights, box_types, spec, presolved, time_limit,
+                backend, solver_args):
+    """Solve Model A for one spec (runs in a worker process)."""
+    start = time.perf_counter()
+    model = MODEL_A_BACKENDS[backend](
+        lengths, widths, heights, spec["W"], spec["L"], spec["H"], spec["BUF"],
+        presolved=presolved
+    )
+    monitor = SolveMonitor(stall_time=stall_time_for(model.num_boxes, time_limit))
+    solved = model.solve(solver="ortools", time_limit=time_limit, monitor=monitor, **solver_args)
+
+    layout = Layout.from_model(model, box_types=box_types) if solved else None
+    return {
+        "status": monitor.stop_reason if solved else "no_solution",
+        "layout": layout,
+        "solve_time": time.perf_counter() - start,
+        "gap": monitor.gap(),
+    }
+
+
+def sweep_containers(order, specs, time_limit=30, workers=None, backend="cpsat", presolve=True,
+                     **solver_args):
+    """
+    Solve one order against every container spec.
+
+    order:  path to an order Excel file, or the tuple returned by
+            parse_pallet_excel (lengths, widths, heights, pallets_data)
+    specs:  list of dicts {"name", "W", "L", "H", "BUF"} (see CONTAINER_SPECS)
+
+    Returns one dict per spec, best first:
+        {"spec", "status", "reason", "layout", "fill_rate",
+         "free_length", "solve_time", "gap"}
+    status is "pruned" / "infeasible" (never solved), "no_solution",
+    or the SolveMonitor stop reason ("optimal", "gap", "stalled", "time_limit").
+    """
+    if isinstance(order, str):
+        order = parse_pallet_excel(order)
+    lengths, widths, heights, pallets_data = order
+    box_types = box_types_from_pallets_data(pallets_data)
+    pallet_volume = sum(l * w * h for l, w, h in zip(lengths, widths, heights))
+
+    results = []
+    to_solve = []
+    geometry = None
+    for spec in specs:
+        result = {
+            "spec": spec, "status": None, "reason": None, "layout": None,
+            "fill_rate": None, "free_length": None, "solve_time": 0.0, "gap": None,
+        }
+        results.append(result)
+
+        reason = _prune_reason(lengths, widths, heights, spec)
+        if reason is not None:
+            result["status"], result["reason"] = "pruned", reason
+            continue
+
+        presolved = None
+        if presolve:
+            if geometry is None:
+                geometry = OrderGeometry(lengths, widths, heights)
+            try:
+                presolved = presolve_instance(lengths, widths, heights, spec["W"], spec["L"],
+                                              spec["H"], spec["BUF"], geometry=geometry)
+            except InfeasibleInstanceError as e:
+                result["status"], result["reason"] = "infeasible", str(e)
+                continue
+
+        to_solve.append((result, presolved))
+
+    if to_solve:
+        if workers is None:
+            workers = min(len(to_solve), os.cpu_count() or 1)
+        # Share the cores between the concurrent CP-SAT runs
+        solver_args.setdefault("num_search_workers", max(1, (os.cpu_count() or 1) // workers))
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_solve_spec, lengths, widths, heights, box_types, result["spec"],
+                            presolved, time_limit, backend, solver_args)
+                for (result, presolved) in to_solve
+            ]
+            for (result, _), future in zip(to_solve, futures):
+                result.update(future.result())
+
+    for result in results:
+        layout = result["layout"]
+        if layout is None:
+            continue
+        spec = result["spec"]
+        result["fill_rate"] = pallet_volume / (spec["W"] * spec["L"] * spec["H"])
+        result["free_length"] = layout.free_length()
+        violations = validate_layout(layout)
+        if violations:
+            result["status"] = "invalid"
+            result["reason"] = violations[0]["message"]
+
+    # Solved and valid first, highest fill rate, then most free length
+    def rank(r):
+        ok = r["layout"] is not None and r["status"] != "invalid"
+        return (not ok, -(r["fill_rate"] or 0.0), -(r["free_length"] or 0), r["solve_time"])
+
+    results.sort(key=rank)
+    return results
+
+
+def print_sweep(results):
+    header = f"{'container':<15} {'status':<12} {'fill':>6} {'free len':>9} {'time':>7}  note"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        fill = f"{r['fill_rate']:.1%}" if r["fill_rate"] is not None else "-"
+        free = str(r["free_length"]) if r["free_length"] is not None else "-"
+        print(
+            f"{r['spec']['name']:<15} {r['status']:<12} {fill:>6} {free:>9} "
+            f"{r['solve_time']:6.1f}s  {r['reason'] or ''}"
+        )
+
+
+# Simple manual test
+if __name__ == "__main__":
+    results = sweep_containers(
+        "sample_instances/input_template.xlsx",
+        list(CONTAINER_SPECS.values()),
+        time_limit=20
+    )
+    print_sweep(results)
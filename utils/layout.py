@@ -0,0 +1,218 @@
+# layout.py
+#
+# Compact, array-backed layout of placed pallets.
+#
+# One row per pallet in a NumPy structured array with columns
+#   id, type, x, y, z, w, l, h, rot
+# where (w, l) are the effective footprint along (X, Y) after rotation.
+# A Layout is extracted once from a solved model and then shared by the
+# visualizer, Model B, the validator and anything that saves results.
+
+import json
+
+import numpy as np
+
+from models.A_box_placement_model import solution_value
+
+
+LAYOUT_DTYPE = np.dtype([
+    ("id",   "<i4"),
+    ("type", "<i4"),   # index into pallets_data, -1 if unknown
+    ("x",    "<i4"),
+    ("y",    "<i4"),
+    ("z",    "<i4"),
+    ("w",    "<i4"),   # effective width  (X)
+    ("l",    "<i4"),   # effective length (Y)
+    ("h",    "<i4"),
+    ("rot",  "u1"),    # 0 = normal, 1 = swapped
+])
+
+COLUMNS = list(LAYOUT_DTYPE.names)
+
+
+def box_types_from_pallets_data(pallets_data):
+    """
+    Type index per individual pallet, in the same order as the flat lists
+    returned by parse_pallet_excel (each type repeated 'count' times).
+    """
+    types = []
+    for t, p in enumerate(pallets_data):
+        types.extend([t] * int(p["count"]))
+    return types
+
+
+def _column_values(entries):
+    """Solution values of one model column as an int array."""
+    if hasattr(entries, "value"):
+        # NDVarArray: one call for the whole column
+        return np.asarray(entries.value(), dtype=np.int64)
+    # Mixed list of vars and presolve constants
+    return np.array([solution_value(e) for e in entries], dtype=np.int64)
+
+
+class Layout:
+    """
+    Placed pallets plus the container they were placed in.
+
+    layout["x"]      -> column (NumPy array view)
+    layout[3]        -> single row
+    layout[mask]     -> sub-Layout
+    for b in layout  -> rows, indexable like the old box dicts (b["x"], ...)
+    """
+
+    def __init__(self, boxes, W, L, H, BUF=0):
+        boxes = np.asarray(boxes)
+        if boxes.dtype != LAYOUT_DTYPE:
+            raise TypeError(f"Layout expects dtype {LAYOUT_DTYPE}, got {boxes.dtype}")
+        self.boxes = boxes
+        self.W = int(W)
+        self.L = int(L)
+        self.H = int(H)
+        self.BUF = int(BUF)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def empty(cls, n, W, L, H, BUF=0):
+        boxes = np.zeros(n, dtype=LAYOUT_DTYPE)
+        boxes["type"] = -1
+        return cls(boxes, W, L, H, BUF)
+
+    @classmethod
+    def from_model(cls, model, pallets_data=None, box_types=None):
+        """
+        Extract the solution of a solved BoxPlacementModel in one pass.
+        Pallet types come from box_types, or are derived from pallets_data.
+        """
+        n = model.num_boxes
+        layout = cls.empty(n, model.W, model.L, model.H, model.BUF)
+        b = layout.boxes
+
+        b["id"]  = np.arange(1, n + 1)
+        b["x"]   = _column_values(model.x)
+        b["y"]   = _column_values(model.y)
+        b["z"]   = _column_values(model.z)
+        b["w"]   = _column_values(model.eff_wid)
+        b["l"]   = _column_values(model.eff_len)
+        b["h"]   = model.heights
+        b["rot"] = _column_values(model.rot)
+
+        if box_types is None and pallets_data is not None:
+            box_types = box_types_from_pallets_data(pallets_data)
+        if box_types is not None:
+            b["type"] = box_types
+        return layout
+
+    @classmethod
+    def from_boxes(cls, boxes, W, L, H, BUF=0):
+        """Build a Layout from a list of box dicts (keys as in COLUMNS)."""
+        layout = cls.empty(len(boxes), W, L, H, BUF)
+        for name in COLUMNS:
+            if boxes and name in boxes[0]:
+                layout.boxes[name] = [bx[name] for bx in boxes]
+        return layout
+
+    def concat(self, other):
+        """New Layout with the rows of self followed by the rows of other."""
+        return Layout(
+            np.concatenate([self.boxes, other.boxes]),
+            self.W, self.L, self.H, self.BUF
+        )
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return len(self.boxes)
+
+    def __iter__(self):
+        return iter(self.boxes)
+
+    def __getitem__(self, key):
+        if isinstance(key, str) or isinstance(key, (int, np.integer)):
+            return self.boxes[key]
+        return Layout(self.boxes[key], self.W, self.L, self.H, self.BUF)
+
+    def to_boxes(self):
+        """List of plain box dicts (python ints), e.g. for printing."""
+        return [
+            {name: int(row[name]) for name in COLUMNS}
+            for row in self.boxes
+        ]
+
+    @property
+    def max_x_extent(self):
+        return int((self.boxes["x"] + self.boxes["w"]).max()) if len(self) else 0
+
+    @property
+    def max_y_extent(self):
+        return int((self.boxes["y"] + self.boxes["l"]).max()) if len(self) else 0
+
+    @property
+    def max_used_height(self):
+        return int((self.boxes["z"] + self.boxes["h"]).max()) if len(self) else 0
+
+    def free_length(self):
+        """Remaining free length along Y behind the placed pallets."""
+        return max(0, self.L - self.max_y_extent)
+
+    def objective(self):
+        """Model A objective value of this layout."""
+        return 1000 * self.max_used_height + self.max_y_extent + self.max_x_extent
+
+    # ------------------------------------------------------------------
+    # Serialisation
+    # ------------------------------------------------------------------
+    def meta(self):
+        return {"W": self.W, "L": self.L, "H": self.H, "BUF": self.BUF}
+
+    def to_json(self):
+        """Compact JSON view: container + column names + one list per row."""
+        return json.dumps({
+            "container": self.meta(),
+            "columns": COLUMNS,
+            "rows": self.boxes.tolist(),
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        c = data["container"]
+        rows = [tuple(r) for r in data["rows"]]
+        boxes = np.array(rows, dtype=LAYOUT_DTYPE) if rows else np.zeros(0, LAYOUT_DTYPE)
+        return cls(boxes, c["W"], c["L"], c["H"], c["BUF"])
+
+    def save(self, stem):
+        """
+        Write <stem>.npy (raw rows, memory-mappable) and <stem>.json
+        (JSON view incl. container). Returns the .npy path.
+        """
+        np.save(f"{stem}.npy", self.boxes, allow_pickle=False)
+        with open(f"{stem}.json", "w") as f:
+            f.write(self.to_json())
+        return f"{stem}.npy"
+
+    @classmethod
+    def load(cls, stem, mmap=True):
+        """
+        Load a layout written by save(). With mmap=True the rows are a
+        read-only memory map of the .npy file (no copy).
+        """
+        boxes = np.load(f"{stem}.npy", mmap_mode="r" if mmap else None, allow_pickle=False)
+        with open(f"{stem}.json") as f:
+            c = json.load(f)["container"]
+        return cls(boxes, c["W"], c["L"], c["H"], c["BUF"])
+
+    def save_npz(self, path):
+        """Single-file archive (rows + container), e.g. for caching many layouts."""
+        np.savez(path, boxes=self.boxes, container=np.array(
+            [self.W, self.L, self.H, self.BUF], dtype=np.int64
+        ))
+        return path
+
+    @classmethod
+    def load_npz(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            W, L, H, BUF = (int(v) for v in data["container"])
+            return cls(data["boxes"], W, L, H, BUF)
@@ -0,0 +1,330 @@
+# lns.py
+#
+# Large Neighbourhood Search around Model A (BoxPlacementModel).
+#
+# For orders too large for one monolithic solve:
+#   1) start from any feasible Layout (e.g. greedy_layout below)
+#   2) pick a neighbourhood: a Y-slab, one pallet type, or the pallets
+#      around the tallest column
+#   3) free those pallets (plus everything standing on them), keep the
+#      rest as fixed_boxes, and re-optimise the freed pallets with the CP model
+#   4) accept the new layout if the Model A objective improved
+# until the time budget is used up.
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from models import MODEL_A_BACKENDS
+from utils.layout import Layout, LAYOUT_DTYPE
+from utils.presolve import presolve_instance, InfeasibleInstanceError
+from utils.validate_layout import validate_layout
+
+
+# ----------------------------------------------------------------------
+# Start layout
+# ----------------------------------------------------------------------
+
+def greedy_layout(lengths, widths, heights, W, L, H, BUF, box_types=None):
+    """
+    Quick feasible layout: build columns (largest footprint at the bottom,
+    smaller pallets stacked on the lowest column they fit on), then place
+    the columns row by row across X, advancing along Y.
+    Returns a Layout, or None if the columns do not fit in L.
+    """
+    n = len(lengths)
+
+    def orientations(p):
+        Lp, Wp = int(lengths[p]), int(widths[p])
+        out = []
+        if Wp <= W and Lp <= L:
+            out.append((0, Wp, Lp))
+        if Lp != Wp and Lp <= W and Wp <= L:
+            out.append((1, Lp, Wp))
+        # long side along Y first
+        out.sort(key=lambda o: o[1] > o[2])
+        return out
+
+    order = sorted(
+        range(n),
+        key=lambda p: (-int(lengths[p]) * int(widths[p]), -int(heights[p]))
+    )
+
+    # column = {"w", "l", "top", "items": [(p, rot, w, l, z)]}
+    columns = []
+    for p in order:
+        h = int(heights[p])
+        options = orientations(p)
+        if not options or h > H:
+            return None
+
+        best = None
+        for c in columns:
+            top_w, top_l = c["items"][-1][2], c["items"][-1][3]
+            if c["top"] + h > H:
+                continue
+            for (rot, w, l) in options:
+                if w <= top_w and l <= top_l:
+                    if best is None or c["top"] < best[0]["top"]:
+                        best = (c, rot, w, l)
+                    break
+
+        if best is None:
+            rot, w, l = options[0]
+            columns.append({"w": w, "l": l, "top": h, "items": [(p, rot, w, l, 0)]})
+        else:
+            c, rot, w, l = best
+            c["items"].append((p, rot, w, l, c["top"]))
+            c["top"] += h
+
+    # Rows across X along Y, deepest columns first
+    columns.sort(key=lambda c: -c["l"])
+    boxes = np.zeros(n, dtype=LAYOUT_DTYPE)
+    row_y, row_depth, cursor_x = 0, 0, 0
+    for c in columns:
+        if cursor_x > 0 and cursor_x + c["w"] > W:
+            row_y += row_depth + BUF
+            row_depth, cursor_x = 0, 0
+        if row_y + c["l"] > L:
+            return None
+
+        for (p, rot, w, l, z) in c["items"]:
+            boxes[p] = (p + 1, -1, cursor_x, row_y, z, w, l, int(heights[p]), rot)
+
+        row_depth = max(row_depth, c["l"])
+        cursor_x += c["w"] + BUF
+
+    if box_types is not None:
+        boxes["type"] = box_types
+    return Layout(boxes, W, L, H, BUF)
+
+
+# ----------------------------------------------------------------------
+# Neighbourhoods: (layout, rng, max_free) -> indices of pallets to free
+# ----------------------------------------------------------------------
+
+def _nearest(values, center, max_free):
+    return np.argsort(np.abs(values - center), kind="stable")[:max_free]
+
+
+def free_y_slab(layout, rng, max_free):
+    """The max_free pallets closest (in y) to a random point along the container."""
+    y_mid = layout["y"] + layout["l"] / 2
+    center = rng.uniform(0, max(layout.max_y_extent, 1))
+    return _nearest(y_mid, center, max_free)
+
+
+def free_pallet_type(layout, rng, max_free):
+    """Up to max_free pallets of one randomly chosen pallet type."""
+    types = layout["type"]
+    if (types < 0).all():
+        # No type info: group by dimensions instead
+        w, l = layout["w"], layout["l"]
+        dims = np.stack([np.minimum(w, l), np.maximum(w, l), layout["h"]], axis=1)
+        _, types = np.unique(dims, axis=0, return_inverse=True)
+        types = types.reshape(-1)
+    chosen = rng.choice(sorted(set(types.tolist())))
+    idx = np.flatnonzero(types == chosen)
+    if len(idx) > max_free:
+        idx = np.array(sorted(rng.sample(idx.tolist(), max_free)))
+    return idx
+
+
+def free_tallest_column(layout, rng, max_free):
+    """The stacks around the pallet that reaches highest."""
+    top = layout["z"] + layout["h"]
+    candidates = np.flatnonzero(top == top.max())
+    t = rng.choice(candidates.tolist())
+    y_mid = layout["y"] + layout["l"] / 2
+    return _nearest(y_mid, y_mid[t], max_free)
+
+
+NEIGHBOURHOODS = {
+    "y_slab": free_y_slab,
+    "pallet_type": free_pallet_type,
+    "tallest_column": free_tallest_column,
+}
+
+
+def close_upwards(layout, free):
+    """
+    Extend a boolean mask of freed pallets with every pallet resting
+    (directly or indirectly) on a freed one, so fixed pallets never lose
+    their support.
+    """
+    free = free.copy()
+    x, y, z = (layout[k].astype(np.int64) for k in ("x", "y", "z"))
+    w, l, h = (layout[k].astype(np.int64) for k in ("w", "l", "h"))
+
+    # on_top[p, q]: p stands on q (touching in z, footprints overlap)
+    on_top = (
+        (z[:, None] == (z + h)[None, :]) &
+        (x[:, None] < (x + w)[None, :]) & ((x + w)[:, None] > x[None, :]) &
+        (y[:, None] < (y + l)[None, :]) & ((y + l)[:, None] > y[None, :])
+    )
+    while True:
+        grown = free | (on_top & free[None, :]).any(axis=1)
+        if (grown == free).all():
+            return free
+        free = grown
+
+
+# ----------------------------------------------------------------------
+# Repair: re-optimise the freed pallets with the CP model
+# ----------------------------------------------------------------------
+
+def solve_neighbourhood(layout, free_idx, solver="ortools", time_limit=5, backend="cpmpy",
+                        deadline=None, **solver_args):
+    """
+    Re-place the pallets free_idx of layout with Model A (backend "cpmpy" or
+    "cpsat") while all other pallets stay where they are.
+    deadline (time.time() value) caps the solve after presolve and model
+    building, so large neighbourhoods do not overrun the LNS budget.
+    Returns the new Layout or None.
+    Module-level so it can run in a worker process.
+    """
+    free = np.zeros(len(layout), dtype=bool)
+    free[free_idx] = True
+    rows = layout.boxes[free]
+    fixed = layout[~free]
+
+    # Back to unrotated dimensions: rot=1 means eff_len=width, eff_wid=length
+    rotated = rows["rot"] == 1
+    lengths = np.where(rotated, rows["w"], rows["l"]).tolist()
+    widths  = np.where(rotated, rows["l"], rows["w"]).tolist()
+    heights = rows["h"].tolist()
+
+    try:
+        presolved = presolve_instance(
+            lengths, widths, heights, layout.W, layout.L, layout.H, layout.BUF,
+            fixed_boxes=fixed
+        )
+    except InfeasibleInstanceError:
+        return None
+
+    model = MODEL_A_BACKENDS[backend](
+        lengths, widths, heights, layout.W, layout.L, layout.H, layout.BUF,
+        presolved=presolved, fixed_boxes=fixed
+    )
+    if deadline is not None:
+        time_limit = min(time_limit, deadline - time.time())
+        if time_limit <= 0:
+            return None
+
+    hint = model.hint_from_boxes(rows)
+    if not model.solve(hint=hint, solver=solver, time_limit=time_limit, **solver_args):
+        return None
+
+    sub = Layout.from_model(model)
+    boxes = layout.boxes.copy()
+    for k in ("x", "y", "z", "w", "l", "rot"):
+        boxes[k][free] = sub[k]
+    return Layout(boxes, layout.W, layout.L, layout.H, layout.BUF)
+
+
+# ----------------------------------------------------------------------
+# LNS loop
+# ----------------------------------------------------------------------
+
+def run_lns(layout, time_budget=60, strategies=("y_slab", "pallet_type", "tallest_column"),
+            max_free=10, sub_time_limit=5, workers=1, seed=0, solver="ortools",
+            backend="cpmpy", verbose=True, **solver_args):
+    """
+    Improve a feasible Layout with Large Neighbourhood Search.
+
+    time_budget     total wall time in seconds
+    strategies      names from NEIGHBOURHOODS, picked at random each round
+    max_free        pallets freed per neighbourhood (before closing upwards)
+    sub_time_limit  time limit of each CP re-optimisation
+    workers         neighbourhoods solved in parallel per round (processes);
+                    the best improving one is accepted
+    backend         Model A implementation used for the sub-solves
+
+    Returns (best_layout, stats) with stats:
+        {"iterations", "improvements": {strategy: count},
+         "history": [(seconds, objective)], "time"}
+    """
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    deadline = start + time_budget
+    # Same deadline for the workers (wall clock, comparable across processes)
+    wall_deadline = time.time() + time_budget
+
+    best = layout
+    best_obj = layout.objective()
+    stats = {
+        "iterations": 0,
+        "improvements": {s: 0 for s in strategies},
+        "history": [(0.0, best_obj)],
+    }
+
+    if workers > 1:
+        # Split the cores between the parallel sub-solves
+        solver_args.setdefault("num_search_workers", 1)
+        pool = ProcessPoolExecutor(max_workers=workers)
+    else:
+        pool = None
+
+    try:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0.5:
+                break
+            limit = min(sub_time_limit, remaining)
+
+            # Pick one neighbourhood per worker
+            jobs = []
+            for _ in range(workers):
+                name = rng.choice(strategies)
+                picked = NEIGHBOURHOODS[name](best, rng, max_free)
+                mask = np.zeros(len(best), dtype=bool)
+                mask[picked] = True
+                free_idx = np.flatnonzero(close_upwards(best, mask))
+                jobs.append((name, free_idx))
+
+            if pool is None:
+                results = [
+                    solve_neighbourhood(best, idx, solver=solver, time_limit=limit,
+                                        backend=backend, deadline=wall_deadline, **solver_args)
+                    for (_, idx) in jobs
+                ]
+            else:
+                futures = [
+                    pool.submit(solve_neighbourhood, best, idx, solver=solver,
+                                time_limit=limit, backend=backend, deadline=wall_deadline,
+                                **solver_args)
+                    for (_, idx) in jobs
+                ]
+                results = [f.result() for f in futures]
+
+            stats["iterations"] += len(jobs)
+
+            # Accept the best valid improvement of this round
+            round_best = None
+            for (name, idx), cand in zip(jobs, results):
+                if cand is None:
+                    continue
+                obj = cand.objective()
+                if obj >= best_obj:
+                    continue
+                if validate_layout(cand):
+                    if verbose:
+                        print(f"LNS: rejected invalid {name} candidate")
+                    continue
+                if round_best is None or obj < round_best[1]:
+                    round_best = (name, obj, cand, len(idx))
+
+            if round_best is not None:
+                name, best_obj, best, n_free = round_best
+                stats["improvements"][name] += 1
+                stats["history"].append((time.perf_counter() - start, best_obj))
+                if verbose:
+                    print(f"LNS: {name} ({n_free} freed) -> objective {best_obj}")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    stats["time"] = time.perf_counter() - start
+    return best, stats
@@ -1,37 +1,162 @@
 # pipeline.py
 
-from models.A_box_placement_model import BoxPlacementModel
+from models import MODEL_A_BACKENDS
 from models.B_reccomend_fill_model import ReccomendFillModel
+from utils.layout import Layout, box_types_from_pallets_data
+from utils.lns import greedy_layout, run_lns
+from utils.time_budget import TimeBudget, SolveMonitor, stall_time_for
+from utils.tuning import select_params
 from utils.parse_xlsx import parse_pallet_excel
+from utils.presolve import presolve_instance, InfeasibleInstanceError
+from utils.validate_layout import validate_layout, print_violations
 
 
-def run_box_placement(excel_path, W, L, H, BUF, solver="ortools", time_limit=60):
+def _build_modelA(lengths, widths, heights, W, L, H, BUF, presolve=True, backend="cpmpy"):
+    """
+    Build Model A, running the presolve pass first when enabled.
+    Returns None (after printing why) if presolve proves the order infeasible.
+    """
+    presolved = None
+    if presolve:
+        try:
+            presolved = presolve_instance(lengths, widths, heights, W, L, H, BUF)
+        except InfeasibleInstanceError as e:
+            print(f"Presolve: order cannot fit the container: {e}")
+            return None
+        print(f"Presolve: {presolved.summary()}")
+
+    model_cls = MODEL_A_BACKENDS[backend]
+    return model_cls(lengths, widths, heights, W, L, H, BUF, presolved=presolved)
+
+
+def run_box_placement(excel_path, W, L, H, BUF, solver="ortools", time_limit=60, presolve=True,
+                      backend="cpmpy", params="auto"):
     """
     Run Model A (BoxPlacementModel) on pallets defined in the Excel file.
-    Returns (model, free_len) if solved, else (None, 0).
+    Returns (model, layout, pallets_data) if solved, else (None, None, pallets_data).
+    The Layout is extracted from the solver once; use layout.free_length()
+    for the remaining free length along Y.
+    params: CP-SAT parameters; "auto" picks them from the tuned solver
+    profile for this order's class (see utils/tuning.py).
     """
     lengths, widths, heights, pallets_data = parse_pallet_excel(excel_path)
 
-    model = BoxPlacementModel(lengths, widths, heights, W, L, H, BUF)
+    model = _build_modelA(lengths, widths, heights, W, L, H, BUF, presolve=presolve, backend=backend)
+    if model is None:
+        return None, None, pallets_data
+
+    if params == "auto":
+        params = select_params(lengths, widths, heights, W, L, H, BUF)
 
     # ! Run on 8 CPU threads !
     # solved = model.solve(solver=solver, time_limit=time_limit, num_search_workers=8)
-    solved = model.solve(solver=solver, time_limit=time_limit)
+    solved = model.solve(solver=solver, time_limit=time_limit, **(params or {}))
 
     if not solved:
         print("Box placement model: no solution")
-        return None, 0
+        return None, None, pallets_data
+
+    layout = Layout.from_model(model, pallets_data)
+    print_violations(validate_layout(layout))
+    return model, layout, pallets_data
 
-    # Simple definition: remaining free length along Y
-    max_y = model.max_y_extent.value()
-    free_len = max(0, L - max_y)
 
-    return model, free_len, pallets_data
+def run_pipeline_with_deadline(excel_path, W, L, H, BUF, deadline=90, solver="ortools",
+                               presolve=True, rel_gap=1e-3, backend="cpmpy", params="auto"):
+    """
+    Full pipeline (A -> B) within one overall deadline in seconds.
 
+    Model A gets everything except a small reserve for Model B, but is
+    stopped early once its gap is <= rel_gap or the incumbent stops
+    improving (patience grows with the number of pallets). Whatever is
+    left goes to Model B. params as in run_box_placement.
 
-def run_reccomend_fill(pallets_data, BUF, free_len, solver="ortools", time_limit=60):
+    Returns None if Model A finds no layout, else a dict:
+        {"model", "layout", "pallets_data", "rec", "stop_reason",
+         "timings": {"parse", "A", "B", "total", "deadline"}}
+    """
+    budget = TimeBudget(deadline)
+
+    with budget.stage("parse"):
+        lengths, widths, heights, pallets_data = parse_pallet_excel(excel_path)
+
+    with budget.stage("A"):
+        model = _build_modelA(lengths, widths, heights, W, L, H, BUF,
+                              presolve=presolve, backend=backend)
+        if model is None:
+            return None
+
+        limit_A = budget.allot_A(model.num_boxes, len(pallets_data))
+        monitor = SolveMonitor(rel_gap=rel_gap, stall_time=stall_time_for(model.num_boxes, limit_A))
+        if params == "auto":
+            params = select_params(lengths, widths, heights, W, L, H, BUF)
+        solved = model.solve(solver=solver, time_limit=limit_A, monitor=monitor, **(params or {}))
+
+    print(f"Box placement model: stopped ({monitor.stop_reason}) after "
+          f"{budget.used['A']:.1f}s of {limit_A:.1f}s, gap {monitor.gap():.2%}")
+    if not solved:
+        print("Box placement model: no solution")
+        return None
+
+    layout = Layout.from_model(model, pallets_data)
+    print_violations(validate_layout(layout))
+
+    with budget.stage("B"):
+        rec = run_reccomend_fill(
+            pallets_data, BUF, layout=layout,
+            solver=solver, time_limit=max(budget.remaining(), 0.1)
+        )
+
+    timings = budget.report()
+    print("Time used per stage:", timings)
+    return {
+        "model": model,
+        "layout": layout,
+        "pallets_data": pallets_data,
+        "rec": rec,
+        "stop_reason": monitor.stop_reason,
+        "timings": timings,
+    }
+
+
+def run_box_placement_lns(excel_path, W, L, H, BUF, solver="ortools", time_limit=60, **lns_args):
+    """
+    Model A for large orders: greedy start layout improved by LNS
+    (see utils/lns.py) within time_limit seconds.
+    Returns (layout, pallets_data), or (None, pallets_data) if no start layout.
+    lns_args are passed on to run_lns (strategies, max_free, workers, ...).
+    """
+    lengths, widths, heights, pallets_data = parse_pallet_excel(excel_path)
+
+    try:
+        presolve_instance(lengths, widths, heights, W, L, H, BUF)
+    except InfeasibleInstanceError as e:
+        print(f"Presolve: order cannot fit the container: {e}")
+        return None, pallets_data
+
+    start = greedy_layout(
+        lengths, widths, heights, W, L, H, BUF,
+        box_types=box_types_from_pallets_data(pallets_data)
+    )
+    if start is None:
+        print("LNS: greedy start layout does not fit the container")
+        return None, pallets_data
+
+    print(f"LNS: start objective {start.objective()}")
+    layout, stats = run_lns(start, time_budget=time_limit, solver=solver, **lns_args)
+    print(f"LNS: {stats['iterations']} neighbourhoods in {stats['time']:.1f}s, "
+          f"objective {start.objective()} -> {layout.objective()}")
+
+    print_violations(validate_layout(layout))
+    return layout, pallets_data
+
+
+def run_reccomend_fill(pallets_data, BUF, free_len=None, solver="ortools", time_limit=60,
+                       layout=None):
     """
     Run Model B (ReccomendFillModel) given free_len and pallet types.
+    Instead of free_len, the Model A layout may be passed as layout=...;
+    its free length is used then.
 
     pallets_data is the per-type list from parse_pallet_excel():
       [
@@ -39,6 +164,10 @@ def run_reccomend_fill(pallets_data, BUF, free_len, solver="ortools", time_limit
         ...
       ]
     """
+    assert (free_len is None) != (layout is None), "Pass either free_len or layout"
+    if layout is not None:
+        free_len = layout.free_length()
+
     if free_len <= 0:
         print("No free length available, skipping extra selection.")
         return None
@@ -66,21 +195,27 @@ def run_reccomend_fill(pallets_data, BUF, free_len, solver="ortools", time_limit
     }
 
 
-def run_full_pipeline(excel_path, W, L, H, BUF, solver="ortools", time_limit=60):
+def run_full_pipeline(excel_path, W, L, H, BUF, solver="ortools", time_limit=60, presolve=True,
+                      backend="cpmpy"):
     """
     Full pipeline: A (placement) -> compute free_len -> B (extra selection).
     """
     # 1) Run placement
     lengths, widths, heights, pallets_data = parse_pallet_excel(excel_path)
-    modelA = BoxPlacementModel(lengths, widths, heights, W, L, H, BUF)
+    modelA = _build_modelA(lengths, widths, heights, W, L, H, BUF, presolve=presolve, backend=backend)
+    if modelA is None:
+        print("Box placement model: infeasible order, aborting pipeline.")
+        return
+
     solvedA = modelA.solve(solver=solver, time_limit=time_limit)
 
     if not solvedA:
         print("Box placement model: no solution, aborting pipeline.")
         return
 
-    max_y = modelA.max_y_extent.value()
-    free_len = max(0, L - max_y)
+    layoutA = Layout.from_model(modelA, pallets_data)
+    free_len = layoutA.free_length()
+    print_violations(validate_layout(layoutA))
     print(f"Free length for extra pallets: {free_len}")
 
     # 2) Run extra selection on the same pallet types
@@ -0,0 +1,231 @@
+# presolve.py
+#
+# Instance presolve for Model A (BoxPlacementModel).
+#
+# Everything here is derived from the pallet dimensions and the container
+# alone, before any CP variable exists:
+#   - pallets that can only be placed in one orientation
+#   - square pallets (rotation is meaningless)
+#   - pairs that can never be stacked (combined height > H)
+#   - pairs where q can never support p (footprint of p never fits on q)
+#   - pallets that nothing can support -> must stand on the floor
+#   - volume / floor-area bounds that prove the order can never fit
+#
+# The result is a PresolvedInstance that BoxPlacementModel consumes to drop
+# rot/eff_len/eff_wid variables and impossible disjuncts.
+#
+# The footprint containment between pallets does not depend on the container.
+# OrderGeometry computes it once per order; pass it as geometry= to presolve
+# the same order for several containers (see utils/container_sweep.py).
+
+
+class InfeasibleInstanceError(ValueError):
+    """Raised when presolve proves that the pallets can never fit."""
+
+
+class OrderGeometry:
+    """
+    Container-independent part of presolve for one order.
+
+    fits[p][q] = set of (rot_p, rot_q) for which the footprint of p in
+                 orientation rot_p fits inside the footprint of q in rot_q
+                 (0 = normal, 1 = swapped, as in PresolvedInstance.fixed_rot)
+    """
+
+    def __init__(self, lengths, widths, heights):
+        self.lengths = [int(v) for v in lengths]
+        self.widths  = [int(v) for v in widths]
+        self.heights = [int(v) for v in heights]
+        n = len(self.lengths)
+        assert n == len(self.widths) == len(self.heights)
+
+        prints = [((self.widths[p], self.lengths[p]), (self.lengths[p], self.widths[p]))
+                  for p in range(n)]
+        self.fits = [[set() for _ in range(n)] for _ in range(n)]
+        for p in range(n):
+            for q in range(n):
+                if q == p:
+                    continue
+                for rp, (wp, lp) in enumerate(prints[p]):
+                    for rq, (wq, lq) in enumerate(prints[q]):
+                        if wp <= wq and lp <= lq:
+                            self.fits[p][q].add((rp, rq))
+
+
+class PresolvedInstance:
+    """
+    Reduced, annotated instance for BoxPlacementModel.
+
+    Per pallet p:
+        fixed_rot[p]  = None (free), 0 (normal) or 1 (swapped)
+        is_square[p]  = length == width
+        must_floor[p] = no other pallet can ever support p -> z[p] == 0
+
+    Per pair:
+        can_stack(p, q)   = p and q fit on top of each other in height
+        can_support(q, p) = q can carry p (height + footprint containment)
+
+    With fixed_boxes (immovable pallets, see BoxPlacementModel), also
+        fixed_supporters[p] = indices of fixed pallets that can carry p
+    """
+
+    def __init__(self, lengths, widths, heights, W, L, H, BUF, geometry=None):
+        if geometry is None:
+            geometry = OrderGeometry(lengths, widths, heights)
+        self.geometry = geometry
+        self.lengths = geometry.lengths
+        self.widths  = geometry.widths
+        self.heights = geometry.heights
+        self.W = int(W)
+        self.L = int(L)
+        self.H = int(H)
+        self.BUF = int(BUF)
+
+        self.num_boxes = len(self.lengths)
+        assert self.num_boxes == len(self.widths) == len(self.heights)
+
+        self.fixed_rot  = [None] * self.num_boxes
+        self.is_square  = [False] * self.num_boxes
+        self.must_floor = [False] * self.num_boxes
+
+        # Support candidates: supporters[p] = set of q that can carry p
+        self.supporters = [set() for _ in range(self.num_boxes)]
+        self.fixed_supporters = [set() for _ in range(self.num_boxes)]
+
+    # ------------------------------------------------------------------
+    # Queries used by the model
+    # ------------------------------------------------------------------
+    def footprints(self, p):
+        """All (eff_wid, eff_len) footprints pallet p may take."""
+        Lp, Wp = self.lengths[p], self.widths[p]
+        rot = self.fixed_rot[p]
+        if rot == 0:
+            return [(Wp, Lp)]
+        if rot == 1:
+            return [(Lp, Wp)]
+        return [(Wp, Lp), (Lp, Wp)]
+
+    def can_stack(self, p, q):
+        """True if p and q may be stacked (in either order) inside H."""
+        return self.heights[p] + self.heights[q] <= self.H
+
+    def can_support(self, q, p):
+        """True if q may ever be the pallet directly below p."""
+        return q in self.supporters[p]
+
+    def can_be_below(self, p, q):
+        """True if p may ever lie somewhere below q (z[p] + h[p] <= z[q])."""
+        return self.can_stack(p, q) and not self.must_floor[q]
+
+    def num_free_rotations(self):
+        return sum(1 for r in self.fixed_rot if r is None)
+
+    def summary(self):
+        """Short human-readable description of what presolve derived."""
+        n = self.num_boxes
+        n_pairs = n * (n - 1) // 2
+        n_stack = sum(
+            1 for p in range(n) for q in range(p + 1, n) if self.can_stack(p, q)
+        )
+        return (
+            f"{n} pallets, "
+            f"{n - self.num_free_rotations()} fixed orientation "
+            f"({sum(self.is_square)} square), "
+            f"{sum(self.must_floor)} on floor, "
+            f"{n_stack}/{n_pairs} stackable pairs"
+        )
+
+
+def _fits_on(p_prints, q_prints):
+    """True if some footprint of p fits inside some footprint of q."""
+    for (wp, lp) in p_prints:
+        for (wq, lq) in q_prints:
+            if wp <= wq and lp <= lq:
+                return True
+    return False
+
+
+def presolve_instance(lengths, widths, heights, W, L, H, BUF, fixed_boxes=None, geometry=None):
+    """
+    Analyse the flat pallet lists (as returned by parse_pallet_excel)
+    and return a PresolvedInstance.
+    fixed_boxes: optional immovable pallets (rows with x, y, z, w, l, h)
+    that the pallets may also stand on.
+    geometry: optional OrderGeometry of the same pallets, reused instead of
+    recomputing the footprint containment.
+
+    Raises InfeasibleInstanceError as soon as a pallet or the whole order
+    is proven not to fit, so callers never start a solve that cannot succeed.
+    """
+    inst = PresolvedInstance(lengths, widths, heights, W, L, H, BUF, geometry=geometry)
+    n = inst.num_boxes
+    B = inst.BUF
+
+    # --- Per pallet: orientation and height ---
+    for p in range(n):
+        Lp, Wp, Hp = inst.lengths[p], inst.widths[p], inst.heights[p]
+
+        if Hp > inst.H:
+            raise InfeasibleInstanceError(
+                f"Pallet {p} has height {Hp} > container height {inst.H}"
+            )
+
+        normal_fits  = Wp <= inst.W and Lp <= inst.L
+        rotated_fits = Lp <= inst.W and Wp <= inst.L
+
+        if Lp == Wp:
+            inst.is_square[p] = True
+            inst.fixed_rot[p] = 0
+        elif normal_fits and not rotated_fits:
+            inst.fixed_rot[p] = 0
+        elif rotated_fits and not normal_fits:
+            inst.fixed_rot[p] = 1
+
+        if not (normal_fits or rotated_fits):
+            raise InfeasibleInstanceError(
+                f"Pallet {p} ({Lp}x{Wp}) does not fit the {inst.W}x{inst.L} floor "
+                f"in any orientation"
+            )
+
+    # --- Per pair: who can carry whom ---
+    prints = [inst.footprints(p) for p in range(n)]
+    rots = [(0, 1) if inst.fixed_rot[p] is None else (inst.fixed_rot[p],) for p in range(n)]
+    fits = inst.geometry.fits
+    fixed = [
+        (int(b["z"]) + int(b["h"]), int(b["w"]), int(b["l"]))
+        for b in (fixed_boxes if fixed_boxes is not None else [])
+    ]
+    for p in range(n):
+        for q in range(n):
+            if q == p or not inst.can_stack(p, q):
+                continue
+            if any((rp, rq) in fits[p][q] for rp in rots[p] for rq in rots[q]):
+                inst.supporters[p].add(q)
+        for k, (top, fw, fl) in enumerate(fixed):
+            if top + inst.heights[p] <= inst.H and _fits_on(prints[p], [(fw, fl)]):
+                inst.fixed_supporters[p].add(k)
+        if not inst.supporters[p] and not inst.fixed_supporters[p]:
+            inst.must_floor[p] = True
+
+    # --- Global bounds ---
+    # Grow every pallet by BUF in x and y (and the container by BUF too):
+    # pallets separated by >= BUF then become disjoint boxes, pallets that
+    # are stacked were already disjoint in z. So the grown volumes must fit.
+    min_print = [min((w + B) * (l + B) for (w, l) in prints[p]) for p in range(n)]
+
+    volume = sum(min_print[p] * inst.heights[p] for p in range(n))
+    capacity = (inst.W + B) * (inst.L + B) * inst.H
+    if volume > capacity:
+        raise InfeasibleInstanceError(
+            f"Total pallet volume (incl. buffer) {volume} exceeds container volume {capacity}"
+        )
+
+    floor_area = sum(min_print[p] for p in range(n) if inst.must_floor[p])
+    floor_capacity = (inst.W + B) * (inst.L + B)
+    if floor_area > floor_capacity:
+        raise InfeasibleInstanceError(
+            f"Pallets that must stand on the floor need area {floor_area} "
+            f"> floor area {floor_capacity}"
+        )
+
+    return inst
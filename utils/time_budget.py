@@ -0,0 +1,175 @@
+# time_budget.py
+#
+# One overall deadline for the pipeline, split between the stages at run time.
+#
+# TimeBudget   keeps track of the deadline and of the time each stage used.
+# SolveMonitor is a CP-SAT solution callback for Model A that follows the
+#              incumbent and the bound, and stops the search early when the
+#              gap is closed or the incumbent stops improving, so the time
+#              left over goes to the next stage.
+
+import threading
+import time
+from contextlib import contextmanager
+
+from ortools.sat.python import cp_model as ort
+
+
+# Upper bound on Model A's share of the deadline: A_BASE_TIME + A_TIME_PER_BOX * pallets
+A_BASE_TIME = 10.0
+A_TIME_PER_BOX = 2.0
+
+
+class TimeBudget:
+    """
+    Overall deadline in seconds, starting now.
+
+        budget = TimeBudget(90)
+        with budget.stage("A"):
+            ... solve with time_limit=budget.allot_A(n) ...
+        print(budget.report())
+    """
+
+    def __init__(self, deadline):
+        self.deadline = float(deadline)
+        self.start = time.perf_counter()
+        self.used = {}
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def remaining(self):
+        return max(0.0, self.deadline - self.elapsed())
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.used[name] = self.used.get(name, 0.0) + time.perf_counter() - t0
+
+    def allot_A(self, num_boxes, num_types=1):
+        """
+        Time limit for Model A: everything that is left, minus a small
+        reserve for Model B (a knapsack over pallet types, solves in well
+        under a second for realistic orders), but at most A_BASE_TIME +
+        A_TIME_PER_BOX seconds per pallet, so small orders leave the rest
+        of the deadline unused instead of searching for a proof.
+        Stage A usually ends earlier through SolveMonitor.
+        """
+        remaining = self.remaining()
+        reserve_B = min(0.1 * remaining, max(1.0, 0.2 * num_types))
+        cap_A = A_BASE_TIME + A_TIME_PER_BOX * num_boxes
+        return max(0.0, min(remaining - reserve_B, cap_A))
+
+    def report(self):
+        """Seconds used per stage, plus total and the deadline."""
+        out = {name: round(t, 3) for name, t in self.used.items()}
+        out["total"] = round(self.elapsed(), 3)
+        out["deadline"] = self.deadline
+        return out
+
+
+def stall_time_for(num_boxes, time_limit):
+    """
+    How long Model A may go without a better incumbent before we stop it.
+    Larger instances get more patience, but never more than a quarter of
+    the stage time.
+    """
+    return max(2.0, min(0.25 * time_limit, 1.0 + 0.1 * num_boxes))
+
+
+class SolveMonitor(ort.CpSolverSolutionCallback):
+    """
+    Solution callback that records (seconds, objective, bound) per incumbent
+    and stops the search when
+      - the relative gap (objective - bound) / objective <= rel_gap, or
+      - no better incumbent was found for stall_time seconds.
+    Use with BoxPlacementModel.solve(monitor=...).
+    """
+
+    def __init__(self, rel_gap=1e-3, stall_time=None, on_solution=None):
+        super().__init__()
+        self.rel_gap = rel_gap
+        self.stall_time = stall_time
+        self.on_solution = on_solution
+
+        self.history = []
+        self.stop_reason = None
+        self._solver = None
+        self._last_improvement = None
+        self._done = threading.Event()
+        self._watchdog = None
+
+    # ------------------------------------------------------------------
+    # Called by BoxPlacementModel.solve
+    # ------------------------------------------------------------------
+    def attach(self, solver):
+        """Start watching a CPMpy ortools solver before its solve() call."""
+        self._solver = solver
+        self._started = time.perf_counter()
+        self._last_improvement = self._started
+        self._done.clear()
+        self._watchdog = threading.Thread(target=self._watch, daemon=True)
+        self._watchdog.start()
+
+    def detach(self):
+        """Stop watching, and settle stop_reason from the final solver state."""
+        self._done.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+        if self.stop_reason is None:
+            status = self._solver.ort_solver.response_proto.status
+            if status == ort.OPTIMAL:
+                self.stop_reason = "optimal"
+            elif status == ort.INFEASIBLE:
+                self.stop_reason = "infeasible"
+            else:
+                self.stop_reason = "time_limit"
+
+    def stop(self, reason):
+        """
+        Stop the running search (safe to call from any thread).
+        Also works before attach: the search then stops as soon as it starts.
+        """
+        if self.stop_reason is None:
+            self.stop_reason = reason
+        if self._solver is not None:
+            self._solver.ort_solver.stop_search()
+
+    # ------------------------------------------------------------------
+    # CP-SAT callback
+    # ------------------------------------------------------------------
+    def on_solution_callback(self):
+        t = time.perf_counter() - self._started
+        obj = self.ObjectiveValue()
+        bound = self.BestObjectiveBound()
+        self.history.append((t, obj, bound))
+        self._last_improvement = time.perf_counter()
+
+        if self.on_solution is not None:
+            self.on_solution(t, obj, bound)
+
+        if self.gap() <= self.rel_gap:
+            self.stop("gap")
+
+    def gap(self):
+        """Relative gap of the last incumbent (1.0 before the first one)."""
+        if not self.history:
+            return 1.0
+        _, obj, bound = self.history[-1]
+        return abs(obj - bound) / max(abs(obj), 1.0)
+
+    def _watch(self):
+        # Runs for the whole solve. Once a stop was requested it keeps calling
+        # stop_search(): a stop() that arrives before CP-SAT has started its
+        # search (e.g. a cancellation right after attach) would otherwise be lost.
+        while not self._done.wait(0.1):
+            if self.stop_reason is not None:
+                self._solver.ort_solver.stop_search()
+            elif (self.stall_time is not None and self.history and
+                  time.perf_counter() - self._last_improvement >= self.stall_time):
+                self.stop("stalled")
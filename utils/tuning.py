@@ -0,0 +1,256 @@
+# tuning.py
+#
+# Per-instance-class CP-SAT parameters for Model A.
+#
+# run_tuning solves a corpus of order files with a set of CP-SAT parameter
+# configurations, groups the orders by class (number of pallets, number of
+# distinct pallet types) and keeps the best configuration per class in a JSON
+# profile. run_box_placement reads that profile through select_params and
+# solves with the parameters of the order's class; without a profile (or for
+# a class that was never tuned, or a profile tuned for another container)
+# CP-SAT keeps its defaults.
+#
+#   python -m utils.tuning      # tunes on sample_instances/*.xlsx
+#
+# Tune on the machine that runs the solves: the best num_search_workers
+# depends on the cores available.
+
+import glob
+import json
+import os
+import random
+
+from ortools.sat.python.cp_model_helper import SatParameters
+
+from models import MODEL_A_BACKENDS
+from utils.parse_xlsx import parse_pallet_excel
+from utils.presolve import presolve_instance, InfeasibleInstanceError
+from utils.time_budget import SolveMonitor
+
+
+DEFAULT_PROFILE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "resources", "solver_profile.json"
+)
+
+# Presolve effort as CP-SAT parameters
+PRESOLVE_EFFORT = {
+    "off":   {"cp_model_presolve": False},
+    "light": {"max_presolve_iterations": 1},
+    "full":  {},
+}
+
+PARAM_SPACE = {
+    "num_search_workers": [1, 4, 8],
+    "search_branching": ["AUTOMATIC_SEARCH", "FIXED_SEARCH", "PORTFOLIO_SEARCH"],
+    "linearization_level": [0, 1, 2],
+    "presolve_effort": list(PRESOLVE_EFFORT),
+    "symmetry_level": [0, 2],
+}
+
+# A run counts as "good" from the first incumbent within this relative gap of
+# the best objective any configuration reached on the order
+TARGET_GAP = 0.01
+
+SIZE_CLASSES = [(20, "small"), (60, "medium"), (float("inf"), "large")]
+MIX_CLASSES = [(2, "uniform"), (6, "mixed"), (float("inf"), "diverse")]
+
+
+def instance_class(lengths, widths, heights):
+    """Class name "<size>/<mix>", e.g. "small/mixed", of an order."""
+    n = len(lengths)
+    num_types = len({(min(l, w), max(l, w), h) for l, w, h in zip(lengths, widths, heights)})
+    size = next(name for limit, name in SIZE_CLASSES if n <= limit)
+    mix = next(name for limit, name in MIX_CLASSES if num_types <= limit)
+    return f"{size}/{mix}"
+
+
+def solver_args_from_config(config):
+    """CP-SAT keyword arguments for model.solve from a configuration dict."""
+    args = {k: v for k, v in config.items() if k != "presolve_effort"}
+    if "search_branching" in args:
+        # Stored by name in the profile; CP-SAT wants the enum value
+        args["search_branching"] = getattr(SatParameters, args["search_branching"])
+    args.update(PRESOLVE_EFFORT[config.get("presolve_effort", "full")])
+    return args
+
+
+def sample_configs(n_configs=12, seed=0):
+    """
+    The CP-SAT default configuration plus n_configs - 1 distinct random
+    configurations from PARAM_SPACE.
+    """
+    rng = random.Random(seed)
+    keys = sorted(PARAM_SPACE)
+    total = 1
+    for k in keys:
+        total *= len(PARAM_SPACE[k])
+
+    configs = [{}]
+    seen = set()
+    while len(configs) < min(n_configs, total + 1):
+        config = {k: rng.choice(PARAM_SPACE[k]) for k in keys}
+        key = tuple(config[k] for k in keys)
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+# ----------------------------------------------------------------------
+# Profile
+# ----------------------------------------------------------------------
+
+_profile_cache = {}
+
+
+def load_profile(path=DEFAULT_PROFILE_PATH):
+    """The profile dict, or None if there is no profile file."""
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    cached = _profile_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path) as f:
+            _profile_cache[path] = (mtime, json.load(f))
+    return _profile_cache[path][1]
+
+
+def save_profile(profile, path=DEFAULT_PROFILE_PATH):
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2)
+
+
+def select_params(lengths, widths, heights, W, L, H, BUF, path=DEFAULT_PROFILE_PATH):
+    """
+    CP-SAT keyword arguments tuned for the class of this order in this container.
+    Returns {} (CP-SAT defaults) if there is no profile, the profile was tuned
+    for another container, or the class was not tuned.
+    """
+    profile = load_profile(path)
+    if profile is None:
+        return {}
+    if profile.get("container") != {"W": W, "L": L, "H": H, "BUF": BUF}:
+        print("Solver profile: tuned for another container, using CP-SAT defaults")
+        return {}
+    cls = instance_class(lengths, widths, heights)
+    entry = profile["classes"].get(cls)
+    if entry is None:
+        return {}
+    print(f"Solver profile: {cls} -> {entry['config']}")
+    return solver_args_from_config(entry["config"])
+
+
+# ----------------------------------------------------------------------
+# Harness
+# ----------------------------------------------------------------------
+
+def _run_config(model, config, time_limit):
+    """Solve once; returns (objective or None, [(seconds, objective)] per incumbent)."""
+    monitor = SolveMonitor()
+    solved = model.solve(time_limit=time_limit, monitor=monitor, **solver_args_from_config(config))
+    history = [(round(t, 3), obj) for (t, obj, _) in monitor.history]
+    if not solved or not history:
+        return None, history
+    return history[-1][1], history
+
+
+def _time_to_target(history, target, time_limit):
+    """Seconds until the first incumbent <= target (time_limit if never)."""
+    return next((t for (t, obj) in history if obj <= target), time_limit)
+
+
+def run_tuning(order_files, W, L, H, BUF, configs=None, time_limit=20, backend="cpsat",
+               path=DEFAULT_PROFILE_PATH, verbose=True):
+    """
+    Solve every order with every configuration and store the best
+    configuration per instance class in the profile at path.
+
+    Each order is built once (presolve included) and solved time_limit
+    seconds per configuration. A configuration scores its objective divided
+    by the best objective any configuration reached on that order (1.0 is
+    best; 2.0 when it found nothing), averaged over the orders of a class;
+    ties go to the shorter mean time to a good solution: the first incumbent
+    within TARGET_GAP of that best objective (time_limit if never reached).
+    The cpsat backend is the default because it reuses the built model
+    across configurations; the parameters apply to both backends.
+
+    Returns the profile dict:
+        {"container": {"W", "L", "H", "BUF"}, "time_limit",
+         "classes": {class: {"config", "score", "time" (to a good solution), "orders"}},
+         "results": [{"order", "class", "config", "objective", "history"}]}
+    """
+    if configs is None:
+        configs = sample_configs()
+
+    results = []
+    for order in order_files:
+        try:
+            lengths, widths, heights, _ = parse_pallet_excel(order)
+        except (KeyError, ValueError) as e:
+            print(f"Tuning: skipping {order}: cannot parse ({e})")
+            continue
+        cls = instance_class(lengths, widths, heights)
+        try:
+            presolved = presolve_instance(lengths, widths, heights, W, L, H, BUF)
+        except InfeasibleInstanceError as e:
+            print(f"Tuning: skipping {order}: {e}")
+            continue
+        model = MODEL_A_BACKENDS[backend](lengths, widths, heights, W, L, H, BUF,
+                                          presolved=presolved)
+
+        for i, config in enumerate(configs):
+            obj, history = _run_config(model, config, time_limit)
+            results.append({"order": order, "class": cls, "config": config,
+                            "objective": obj, "history": history})
+            if verbose:
+                print(f"Tuning: {os.path.basename(order)} [{cls}] config {i}: objective {obj}")
+
+    # Normalise per order, then average per (class, config)
+    best_per_order = {}
+    for r in results:
+        if r["objective"] is not None:
+            prev = best_per_order.get(r["order"])
+            best_per_order[r["order"]] = r["objective"] if prev is None else min(prev, r["objective"])
+
+    scores = {}
+    for r in results:
+        best = best_per_order.get(r["order"])
+        if best is None:
+            continue
+        score = 2.0 if r["objective"] is None else r["objective"] / max(best, 1)
+        t = _time_to_target(r["history"], best * (1 + TARGET_GAP), time_limit)
+        key = (r["class"], json.dumps(r["config"], sort_keys=True))
+        entry = scores.setdefault(key, {"score": 0.0, "time": 0.0, "orders": 0})
+        entry["score"] += score
+        entry["time"] += t
+        entry["orders"] += 1
+
+    best_per_class = {}
+    for (cls, config_key), entry in scores.items():
+        mean = (entry["score"] / entry["orders"], entry["time"] / entry["orders"])
+        if cls not in best_per_class or mean < best_per_class[cls][0]:
+            best_per_class[cls] = (mean, config_key, entry["orders"])
+
+    classes = {
+        cls: {"config": json.loads(config_key), "score": round(mean[0], 6),
+              "time": round(mean[1], 3), "orders": orders}
+        for cls, (mean, config_key, orders) in best_per_class.items()
+    }
+
+    profile = {
+        "container": {"W": W, "L": L, "H": H, "BUF": BUF},
+        "time_limit": time_limit,
+        "classes": classes,
+        "results": results,
+    }
+    save_profile(profile, path)
+    if verbose:
+        for cls, entry in sorted(classes.items()):
+            print(f"Tuning: {cls}: {entry['config']} (score {entry['score']}, {entry['orders']} orders)")
+    return profile
+
+
+# Simple manual test
+if __name__ == "__main__":
+    run_tuning(sorted(glob.glob("sample_instances/*.xlsx")), 235, 1203, 270, 5, time_limit=10)
@@ -0,0 +1,200 @@
+# validate_layout.py
+#
+# Independent check of a Layout against the physical rules of Model A:
+#   - bounds:     every pallet lies inside the W x L x H container
+#   - separation: any two pallets are >= BUF apart in X or in Y,
+#                 or do not overlap in Z (stacked)
+#   - support:    a pallet with z > 0 stands with its full footprint
+#                 on top of one other pallet (z == z_q + h_q)
+#
+# Works on any layout (solver output, Model B extras, heuristics).
+# Candidate pairs come from a sweep over the pallets sorted by y: only
+# pallets whose y-ranges (grown by BUF) overlap can break separation or
+# carry each other, so all checks run on that pair list with NumPy.
+
+import time
+
+import numpy as np
+
+from utils.layout import Layout, LAYOUT_DTYPE
+
+
+def _violation(rule, ids, message):
+    return {"rule": rule, "ids": [int(i) for i in ids], "message": message}
+
+
+def candidate_pairs(layout, BUF):
+    """
+    Index pairs (a, b) whose y-ranges overlap when grown by BUF.
+    Every pair that is not separated along Y is returned exactly once.
+    """
+    n = len(layout)
+    if n < 2:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    y = layout["y"].astype(np.int64)
+    l = layout["l"].astype(np.int64)
+
+    order = np.argsort(y, kind="stable")
+    y_sorted = y[order]
+
+    # For the pallet at sorted position i, partners are sorted positions
+    # i+1 .. end[i]-1 with y_q < y_p + l_p + BUF
+    start = np.arange(1, n + 1)
+    end = np.searchsorted(y_sorted, y_sorted + l[order] + BUF, side="left")
+    counts = np.maximum(end - start, 0)
+
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    first = np.repeat(np.arange(n), counts)
+    # offsets 0..counts[i]-1 within each group
+    group_start = np.repeat(np.cumsum(counts) - counts, counts)
+    offset = np.arange(total) - group_start
+    second = first + 1 + offset
+
+    return order[first], order[second]
+
+
+def check_bounds(layout, W, L, H):
+    b = layout.boxes
+    bad = (
+        (b["x"] < 0) | (b["y"] < 0) | (b["z"] < 0) |
+        (b["x"] + b["w"] > W) | (b["y"] + b["l"] > L) | (b["z"] + b["h"] > H)
+    )
+    return [
+        _violation(
+            "bounds", [b["id"][i]],
+            f"pallet {b['id'][i]} at ({b['x'][i]}, {b['y'][i]}, {b['z'][i]}) "
+            f"size {b['w'][i]}x{b['l'][i]}x{b['h'][i]} leaves the {W}x{L}x{H} container"
+        )
+        for i in np.flatnonzero(bad)
+    ]
+
+
+def check_separation(layout, BUF, pairs=None):
+    b = layout.boxes
+    a, c = candidate_pairs(layout, BUF) if pairs is None else pairs
+    if len(a) == 0:
+        return []
+
+    x, w = b["x"].astype(np.int64), b["w"].astype(np.int64)
+    z, h = b["z"].astype(np.int64), b["h"].astype(np.int64)
+
+    sep_x = (x[a] + w[a] + BUF <= x[c]) | (x[c] + w[c] + BUF <= x[a])
+    sep_z = (z[a] + h[a] <= z[c]) | (z[c] + h[c] <= z[a])
+    # sep_y is false for every candidate pair by construction
+    bad = ~(sep_x | sep_z)
+
+    ids = b["id"]
+    return [
+        _violation(
+            "separation", [ids[a[k]], ids[c[k]]],
+            f"pallets {ids[a[k]]} and {ids[c[k]]} overlap or are closer than BUF={BUF}"
+        )
+        for k in np.flatnonzero(bad)
+    ]
+
+
+def check_support(layout, BUF, pairs=None):
+    b = layout.boxes
+    n = len(layout)
+    supported = b["z"] == 0
+
+    a, c = candidate_pairs(layout, BUF) if pairs is None else pairs
+    if len(a) > 0:
+        x, y, z = (b[k].astype(np.int64) for k in ("x", "y", "z"))
+        w, l, h = (b[k].astype(np.int64) for k in ("w", "l", "h"))
+
+        def carries(q, p):
+            # q is directly below p and p's footprint lies within q's
+            return (
+                (z[p] == z[q] + h[q]) &
+                (x[p] >= x[q]) & (x[p] + w[p] <= x[q] + w[q]) &
+                (y[p] >= y[q]) & (y[p] + l[p] <= y[q] + l[q])
+            )
+
+        supported_by = np.zeros(n, dtype=bool)
+        supported_by[c[carries(a, c)]] = True
+        supported_by[a[carries(c, a)]] = True
+        supported |= supported_by
+
+    ids = b["id"]
+    return [
+        _violation(
+            "support", [ids[i]],
+            f"pallet {ids[i]} at z={b['z'][i]} is not fully supported by a pallet below it"
+        )
+        for i in np.flatnonzero(~supported)
+    ]
+
+
+def validate_layout(layout, W=None, L=None, H=None, BUF=None):
+    """
+    Check a Layout (or list of box dicts, then W, L, H, BUF are required).
+    Container values default to the ones stored in the Layout.
+
+    Returns a list of violations, each a dict:
+        {"rule": "bounds" | "separation" | "support",
+         "ids": [pallet ids involved],
+         "message": str}
+    An empty list means the layout is valid.
+    """
+    if not isinstance(layout, Layout):
+        layout = Layout.from_boxes(layout, W, L, H, BUF or 0)
+
+    W = layout.W if W is None else int(W)
+    L = layout.L if L is None else int(L)
+    H = layout.H if H is None else int(H)
+    BUF = layout.BUF if BUF is None else int(BUF)
+
+    pairs = candidate_pairs(layout, BUF)
+    return (
+        check_bounds(layout, W, L, H) +
+        check_separation(layout, BUF, pairs) +
+        check_support(layout, BUF, pairs)
+    )
+
+
+def validate_layouts(layouts, **container):
+    """Validate many layouts, e.g. in benchmarks. Returns one list per layout."""
+    return [validate_layout(layout, **container) for layout in layouts]
+
+
+def print_violations(violations, max_lines=20):
+    if not violations:
+        print("Layout check: OK")
+        return
+    print(f"Layout check: {len(violations)} violation(s)")
+    for v in violations[:max_lines]:
+        print(f"  [{v['rule']}] {v['message']}")
+    if len(violations) > max_lines:
+        print(f"  ... {len(violations) - max_lines} more")
+
+
+def _grid_layout(nx, ny, nz, w=80, l=120, h=50, BUF=5):
+    """Valid stacked grid of nx * ny * nz identical pallets (for timing)."""
+    n = nx * ny * nz
+    boxes = np.zeros(n, dtype=LAYOUT_DTYPE)
+    ix, iy, iz = np.meshgrid(np.arange(nx), np.arange(ny), np.arange(nz), indexing="ij")
+    boxes["id"] = np.arange(1, n + 1)
+    boxes["x"] = ix.ravel() * (w + BUF)
+    boxes["y"] = iy.ravel() * (l + BUF)
+    boxes["z"] = iz.ravel() * h
+    boxes["w"], boxes["l"], boxes["h"] = w, l, h
+    return Layout(boxes, nx * (w + BUF), ny * (l + BUF), nz * h, BUF)
+
+
+# Simple manual benchmark
+if __name__ == "__main__":
+    layout = _grid_layout(10, 100, 10)
+
+    start = time.perf_counter()
+    violations = validate_layout(layout)
+    end = time.perf_counter()
+
+    print(f"Validated {len(layout)} pallets in {1000 * (end - start):.1f} ms")
+    print_violations(violations)
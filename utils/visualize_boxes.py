@@ -1,82 +1,304 @@
 # visualize_boxes.py
+import html
+import json
+
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_hex, to_rgba_array
+from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 
+from utils.layout import Layout
 
-def plot_boxes_3d(W, L, H, boxes):
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection='3d')
+
+COLORS = ['tab:blue', 'tab:orange', 'tab:green',
+          'tab:red', 'tab:purple', 'tab:brown',
+          'tab:pink', 'tab:gray', 'tab:olive', 'tab:cyan']
+
+# Boxes with more than this many pallets are drawn without id labels
+# unless labels=True is passed explicitly (one text artist per box is slow).
+AUTO_LABEL_LIMIT = 50
+
+# Corner order: (x, y, z) offsets in units of (w, l, h)
+_CORNERS = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+], dtype=float)
+
+# Six faces as corner indices: bottom, top, front (y=0), back, left (x=0), right
+_FACES = np.array([
+    [0, 1, 2, 3], [4, 5, 6, 7],
+    [0, 1, 5, 4], [3, 2, 6, 7],
+    [0, 3, 7, 4], [1, 2, 6, 5],
+])
+
+# Fixed per-face brightness, roughly what bar3d(shade=True) gives
+_FACE_SHADE = np.array([0.55, 1.0, 0.8, 0.8, 0.65, 0.65])
+
+
+def _as_layout(boxes, W, L, H):
+    """Accept a Layout or a list of box dicts."""
+    if isinstance(boxes, Layout):
+        return boxes
+    return Layout.from_boxes(boxes, W, L, H)
+
+
+def _boxes_to_arrays(layout):
+    """(n, 3) origins and (n, 3) sizes as float arrays."""
+    origin = np.stack([layout["x"], layout["y"], layout["z"]], axis=1).astype(float)
+    size   = np.stack([layout["w"], layout["l"], layout["h"]], axis=1).astype(float)
+    return origin, size
+
+
+def _box_faces(layout, alpha=0.5):
+    """
+    All faces of all boxes in one go.
+    Returns (polys, facecolors) with polys of shape (6n, 4, 3).
+    """
+    origin, size = _boxes_to_arrays(layout)
+    n = len(origin)
+
+    # (n, 8, 3) corner coordinates, then (n, 6, 4, 3) faces
+    corners = origin[:, None, :] + _CORNERS[None, :, :] * size[:, None, :]
+    polys = corners[:, _FACES, :].reshape(n * 6, 4, 3)
+
+    base = to_rgba_array([COLORS[i % len(COLORS)] for i in range(n)])
+    colors = np.repeat(base, 6, axis=0)
+    colors[:, :3] *= np.tile(_FACE_SHADE, n)[:, None]
+    colors[:, 3] = alpha
+    return polys, colors
+
+
+def draw_boxes(ax, W, L, H, boxes, labels=None, alpha=0.5):
+    """
+    Draw all boxes (Layout or list of box dicts) on a 3D axes
+    as a single Poly3DCollection.
+    labels: True / False, or None to label only small layouts.
+    """
+    layout = _as_layout(boxes, W, L, H)
 
     ax.set_xlim(0, W)
     ax.set_ylim(0, L)
     ax.set_zlim(0, H)
     ax.set_box_aspect((W, L, H))
 
-    colors = ['tab:blue', 'tab:orange', 'tab:green',
-              'tab:red', 'tab:purple', 'tab:brown',
-              'tab:pink', 'tab:gray', 'tab:olive', 'tab:cyan']
-
-    for i, b in enumerate(boxes):
-        # bar3d: x, y, z, dx, dy, dz
-        ax.bar3d(
-            b["x"], b["y"], b["z"],
-            b["w"], b["l"], b["h"],
-            alpha=0.5,
-            color=colors[i % len(colors)],
-            edgecolor="k",
-            linewidth=0.5,
-            shade=True
-        )
-
-        # label roughly at center
-        cx = b["x"] + b["w"] / 2
-        cy = b["y"] + b["l"] / 2
-        cz = b["z"] + b["h"] / 2
-        ax.text(cx, cy, cz, str(b["id"]), color="k")
+    if len(layout):
+        polys, colors = _box_faces(layout, alpha=alpha)
+        ax.add_collection3d(Poly3DCollection(
+            polys,
+            facecolors=colors,
+            edgecolors="k",
+            linewidths=0.5,
+        ))
+
+    if labels is None:
+        labels = len(layout) <= AUTO_LABEL_LIMIT
+    if labels:
+        for b in layout:
+            # label roughly at center
+            cx = b["x"] + b["w"] / 2
+            cy = b["y"] + b["l"] / 2
+            cz = b["z"] + b["h"] / 2
+            ax.text(cx, cy, cz, str(b["id"]), color="k")
 
     ax.set_xlabel('X (width)')
     ax.set_ylabel('Y (length)')
     ax.set_zlabel('Z (height)')
 
+
+def plot_boxes_3d(W, L, H, boxes, labels=None, save_path=None, show=True):
+    """
+    Interactive plot of a layout. Optionally also saved to save_path
+    (format from the file extension). Use show=False for batch runs.
+    """
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    draw_boxes(ax, W, L, H, boxes, labels=labels)
+
     plt.tight_layout()
-    plt.show()
+    if save_path is not None:
+        fig.savefig(save_path)
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
+
+
+# -------------------------------------------------------------------
+# Headless export (no display / GUI backend needed)
+# -------------------------------------------------------------------
+
+def save_boxes_png(W, L, H, boxes, path, labels=False, dpi=150):
+    """
+    Render a layout straight to a PNG with the Agg canvas.
+    Does not touch pyplot, so it works on servers without a display.
+    """
+    fig = Figure(figsize=(8, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111, projection='3d')
+    draw_boxes(ax, W, L, H, boxes, labels=labels)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    return path
+
+
+def save_boxes_html(W, L, H, boxes, path, title="Container layout"):
+    """
+    Write a self-contained HTML file (inline JS, no external scripts) with a
+    rotatable 3D view of the layout: drag to rotate, scroll to zoom.
+    """
+    layout = _as_layout(boxes, W, L, H)
+    data = {
+        "container": [W, L, H],
+        "boxes": np.stack(
+            [layout[c] for c in ("id", "x", "y", "z", "w", "l", "h")], axis=1
+        ).tolist(),
+        "colors": [to_hex(c) for c in COLORS],
+    }
+    page = (
+        _HTML_TEMPLATE
+        .replace("__TITLE__", html.escape(title))
+        .replace("__DATA__", json.dumps(data, separators=(",", ":")))
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+    return path
+
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  body { margin: 0; font-family: sans-serif; background: #fafafa; }
+  #info { position: absolute; top: 8px; left: 8px; font-size: 13px; }
+  canvas { display: block; width: 100vw; height: 100vh; cursor: grab; }
+</style>
+</head>
+<body>
+<div id="info">__TITLE__ &mdash; drag to rotate, scroll to zoom</div>
+<canvas id="view"></canvas>
+<script>
+const DATA = __DATA__;
+const [W, L, H] = DATA.container;
+const CORNERS = [[0,0,0],[1,0,0],[1,1,0],[0,1,0],[0,0,1],[1,0,1],[1,1,1],[0,1,1]];
+const FACES = [[0,1,2,3],[4,5,6,7],[0,1,5,4],[3,2,6,7],[0,3,7,4],[1,2,6,5]];
+const SHADE = [0.55, 1.0, 0.8, 0.8, 0.65, 0.65];
+
+const canvas = document.getElementById("view");
+const ctx = canvas.getContext("2d");
+let yaw = -0.6, pitch = 0.5, zoom = 1.0;
+
+// Pre-build every face once: [corners(4x3), rgb, shade]
+const faces = [];
+DATA.boxes.forEach((b, i) => {
+  const [id, x, y, z, w, l, h] = b;
+  const hex = DATA.colors[i % DATA.colors.length];
+  const rgb = [1, 3, 5].map(k => parseInt(hex.substr(k, 2), 16));
+  const pts = CORNERS.map(c => [x + c[0] * w, y + c[1] * l, z + c[2] * h]);
+  FACES.forEach((f, k) => faces.push({pts: f.map(j => pts[j]), rgb: rgb, shade: SHADE[k]}));
+});
+
+function project(p, s, cx, cy) {
+  // centre the container, rotate about z (yaw) then x (pitch)
+  const x = p[0] - W / 2, y = p[1] - L / 2, z = p[2] - H / 2;
+  const x1 = x * Math.cos(yaw) - y * Math.sin(yaw);
+  const y1 = x * Math.sin(yaw) + y * Math.cos(yaw);
+  const y2 = y1 * Math.cos(pitch) - z * Math.sin(pitch);
+  const z2 = y1 * Math.sin(pitch) + z * Math.cos(pitch);
+  return [cx + x1 * s, cy - z2 * s, y2];
+}
+
+function draw() {
+  canvas.width = canvas.clientWidth;
+  canvas.height = canvas.clientHeight;
+  const s = zoom * 0.8 * Math.min(canvas.width, canvas.height) / Math.max(W, L, H);
+  const cx = canvas.width / 2, cy = canvas.height / 2;
+  ctx.clearRect(0, 0, canvas.width, canvas.height);
+
+  // painter's algorithm: far faces first
+  const proj = faces.map(f => {
+    const q = f.pts.map(p => project(p, s, cx, cy));
+    return {q: q, depth: q.reduce((a, v) => a + v[2], 0) / 4, f: f};
+  });
+  proj.sort((a, b) => b.depth - a.depth);
+
+  ctx.lineWidth = 0.5;
+  ctx.strokeStyle = "rgba(0,0,0,0.6)";
+  for (const {q, f} of proj) {
+    const c = f.rgb.map(v => Math.round(v * f.shade));
+    ctx.fillStyle = `rgba(${c[0]},${c[1]},${c[2]},0.6)`;
+    ctx.beginPath();
+    ctx.moveTo(q[0][0], q[0][1]);
+    for (let k = 1; k < 4; k++) ctx.lineTo(q[k][0], q[k][1]);
+    ctx.closePath();
+    ctx.fill();
+    ctx.stroke();
+  }
+
+  // container wireframe
+  const box = CORNERS.map(c => project([c[0] * W, c[1] * L, c[2] * H], s, cx, cy));
+  ctx.strokeStyle = "#333";
+  ctx.lineWidth = 1;
+  for (const f of FACES) {
+    ctx.beginPath();
+    ctx.moveTo(box[f[0]][0], box[f[0]][1]);
+    for (let k = 1; k < 4; k++) ctx.lineTo(box[f[k]][0], box[f[k]][1]);
+    ctx.closePath();
+    ctx.stroke();
+  }
+}
+
+let drag = null;
+canvas.addEventListener("mousedown", e => { drag = [e.clientX, e.clientY]; });
+window.addEventListener("mouseup", () => { drag = null; });
+window.addEventListener("mousemove", e => {
+  if (!drag) return;
+  yaw += (e.clientX - drag[0]) * 0.01;
+  pitch = Math.max(-1.5, Math.min(1.5, pitch + (e.clientY - drag[1]) * 0.01));
+  drag = [e.clientX, e.clientY];
+  draw();
+});
+canvas.addEventListener("wheel", e => {
+  e.preventDefault();
+  zoom *= e.deltaY < 0 ? 1.1 : 1 / 1.1;
+  draw();
+}, {passive: false});
+window.addEventListener("resize", draw);
+draw();
+</script>
+</body>
+</html>
+"""
 
 # -------------------------------------------------------------------
 # Helpers: build boxes from Model A and from B's output
 # -------------------------------------------------------------------
 
-def build_boxes_from_modelA(modelA):
+def build_boxes_from_modelA(modelA, pallets_data=None):
     """
-    Turn a BoxPlacementModel (Model A) solution into a list of box dicts.
+    Turn a BoxPlacementModel (Model A) solution into a Layout.
     """
-    boxes = []
-    for p in range(modelA.num_boxes):
-        boxes.append({
-            "id": p + 1,
-            "x": modelA.x[p].value(),
-            "y": modelA.y[p].value(),
-            "z": modelA.z[p].value(),
-            "w": modelA.eff_wid[p].value(),
-            "l": modelA.eff_len[p].value(),
-            "h": modelA.heights[p],
-        })
-    return boxes
+    return Layout.from_model(modelA, pallets_data=pallets_data)
 
 
-def build_extra_boxes_from_B(modelA, add_list, pallets_data, BUF, W, L, H):
+def build_extra_boxes_from_B(layoutA, add_list, pallets_data, BUF, W, L, H):
     """
     Build a simple 3D layout for extra pallets recommended by Model B.
 
     We only have counts per type (add_list), so we:
       - place extras in a strip along Y
       - at x = 0, z = 0
-      - starting at modelA.max_y_extent
+      - starting BUF behind the max y extent of the Model A layout
       - stop if we run out of container length L
     """
     boxes_extra = []
-    next_id = modelA.num_boxes + 1
+    next_id = len(layoutA) + 1
 
-    start_y = modelA.max_y_extent.value()
+    start_y = layoutA.max_y_extent + BUF if len(layoutA) else 0
     current_y = start_y
 
     for t, count in enumerate(add_list):
@@ -94,6 +316,7 @@ def build_extra_boxes_from_B(modelA, add_list, pallets_data, BUF, W, L, H):
 
             boxes_extra.append({
                 "id": next_id,
+                "type": t,
                 "x": 0,
                 "y": current_y,
                 "z": 0,
@@ -104,28 +327,67 @@ def build_extra_boxes_from_B(modelA, add_list, pallets_data, BUF, W, L, H):
             next_id += 1
             current_y += l + BUF
 
-    return boxes_extra
+    return Layout.from_boxes(boxes_extra, W, L, H, BUF)
 
 
 # -------------------------------------------------------------------
 # High-level functions for main.py
 # -------------------------------------------------------------------
 
-def plot_modelA(modelA, W, L, H):
+def plot_layout(layout, **plot_args):
+    """
+    Plot a Layout in its own container.
+    plot_args are passed on to plot_boxes_3d (labels, save_path, show).
+    """
+    plot_boxes_3d(layout.W, layout.L, layout.H, layout, **plot_args)
+    return layout
+
+
+def plot_layout_with_extras(layout, add_list, pallets_data, **plot_args):
+    """
+    Plot a Model A layout + extra pallets (from Model B's 'add_list') in one figure.
+    """
+    extra = build_extra_boxes_from_B(
+        layout, add_list, pallets_data, layout.BUF, layout.W, layout.L, layout.H
+    )
+    layout_all = layout.concat(extra)
+    plot_boxes_3d(layout.W, layout.L, layout.H, layout_all, **plot_args)
+    return layout_all
+
+
+def plot_modelA(modelA, W, L, H, **plot_args):
     """
     Plot just the solution of Model A.
     """
-    boxes = build_boxes_from_modelA(modelA)
-    plot_boxes_3d(W, L, H, boxes)
-    return boxes
+    layout = build_boxes_from_modelA(modelA)
+    plot_boxes_3d(W, L, H, layout, **plot_args)
+    return layout
+
+
+def plot_modelA_with_extras(modelA, add_list, pallets_data, BUF, W, L, H, **plot_args):
+    """
+    Plot Model A + extra pallets (from Model B's 'add_list') in one figure,
+    in the container W x L x H with buffer BUF.
+    """
+    layout = build_boxes_from_modelA(modelA, pallets_data)
+    extra = build_extra_boxes_from_B(layout, add_list, pallets_data, BUF, W, L, H)
+    layout_all = layout.concat(extra)
+    plot_boxes_3d(W, L, H, layout_all, **plot_args)
+    return layout_all
 
 
-def plot_modelA_with_extras(modelA, add_list, pallets_data, BUF, W, L, H):
+def export_layout(W, L, H, boxes, path_stem, formats=("png", "html")):
     """
-    Plot Model A + extra pallets (from Model B's 'add_list') in one figure.
+    Headless export of one layout for batch runs: writes <path_stem>.png,
+    <path_stem>.html and/or the raw rows (<path_stem>.npy + .json, "data")
+    and returns the written paths.
     """
-    boxes_main = build_boxes_from_modelA(modelA)
-    boxes_extra = build_extra_boxes_from_B(modelA, add_list, pallets_data, BUF, W, L, H)
-    boxes_all = boxes_main + boxes_extra
-    plot_boxes_3d(W, L, H, boxes_all)
-    return boxes_all    
\ No newline at end of file
+    layout = _as_layout(boxes, W, L, H)
+    paths = []
+    if "data" in formats:
+        paths.append(layout.save(path_stem))
+    if "png" in formats:
+        paths.append(save_boxes_png(W, L, H, layout, f"{path_stem}.png"))
+    if "html" in formats:
+        paths.append(save_boxes_html(W, L, H, layout, f"{path_stem}.html"))
+    return paths    
\ No newline at end of file